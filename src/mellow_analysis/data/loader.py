@@ -8,6 +8,47 @@ from pathlib import Path
 from typing import Tuple, Optional
 import streamlit as st
 
+# Repeated labels stored as pandas categoricals, so equality filters and
+# groupbys compare integer codes instead of Python strings (group with observed=True)
+_CASES_CATEGORICAL = ['category_name', 'subcategory_name']
+_RESPONSES_CATEGORICAL = [
+    'is_user_answer_correct', 'user_answer', 'id_user_hash', 'country_user_made_the_exam'
+]
+
+# Columns whose distinct counts feed the summary statistics
+_CASES_DISTINCT = ['id_exam', 'id_case', 'id_question', 'question', 'category_name', 'subcategory_name']
+_RESPONSES_DISTINCT = ['id_user_hash', 'id_question', 'country_user_made_the_exam']
+
+# Columnar copies of the CSVs, re-read on later cold starts instead of parsing text
+_PARQUET_CACHE_DIR = '.cache'
+
+
+def _read_table(csv_path: Path) -> pd.DataFrame:
+    """
+    Read a dataset CSV through a Parquet copy kept next to it.
+    
+    The copy lives in data_dir/.cache and is used while it is at least as new
+    as the CSV; otherwise the CSV is parsed and the copy rewritten. If the copy
+    can't be written (read-only data dir, columns Arrow can't store), the CSV
+    is simply read each time.
+    """
+    parquet_path = csv_path.parent / _PARQUET_CACHE_DIR / f"{csv_path.stem}.parquet"
+    try:
+        if parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns:
+            return pd.read_parquet(parquet_path, engine='pyarrow')
+    except (OSError, ValueError):
+        pass
+    
+    df = pd.read_csv(csv_path)
+    try:
+        parquet_path.parent.mkdir(exist_ok=True)
+        df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    except (OSError, ValueError, TypeError):
+        # Unwritable dir, or columns Arrow can't type (ArrowInvalid/ArrowTypeError
+        # subclass ValueError/TypeError): drop any partial copy and keep the CSV
+        parquet_path.unlink(missing_ok=True)
+    return df
+
 
 class DataLoader:
     """Handles loading and preprocessing of Mellow Analysis datasets."""
@@ -34,7 +75,10 @@ class DataLoader:
         """
         if _self._cases_df is None:
             cases_path = _self.data_dir / "rc_invokana_cases.csv"
-            _self._cases_df = pd.read_csv(cases_path)
+            _self._cases_df = _read_table(cases_path)
+            
+            # Low-cardinality labels as categoricals: 1-byte codes for groupbys/filters
+            _self._cases_df[_CASES_CATEGORICAL] = _self._cases_df[_CASES_CATEGORICAL].astype('category')
         return _self._cases_df.copy()
     
     @st.cache_data
@@ -47,17 +91,88 @@ class DataLoader:
         """
         if _self._responses_df is None:
             responses_path = _self.data_dir / "rc_invokana_users_responses_nopersonal_hash.csv"
-            _self._responses_df = pd.read_csv(responses_path)
+            _self._responses_df = _read_table(responses_path)
             
             # Add preprocessing
+            _self._responses_df[_RESPONSES_CATEGORICAL] = (
+                _self._responses_df[_RESPONSES_CATEGORICAL].astype('category')
+            )
             _self._responses_df['exam_created_at'] = pd.to_datetime(_self._responses_df['exam_created_at'])
             _self._responses_df['user_created_at'] = pd.to_datetime(_self._responses_df['user_created_at'])
-            _self._responses_df['is_correct'] = (_self._responses_df['is_user_answer_correct'] == 'CORRECTA').astype(int)
-            _self._responses_df['hour'] = _self._responses_df['exam_created_at'].dt.hour
-            _self._responses_df['date'] = _self._responses_df['exam_created_at'].dt.date
+            _self._responses_df['is_correct'] = (_self._responses_df['is_user_answer_correct'] == 'CORRECTA').astype(np.int8)
+            # Nullable Int16: a missing/unparseable exam time leaves <NA> instead of failing the cast
+            _self._responses_df['hour'] = _self._responses_df['exam_created_at'].dt.hour.astype('Int16')
+            _self._responses_df['date'] = _self._responses_df['exam_created_at'].dt.date.astype('category')
+            
+            # Keep each user's responses contiguous and in time order (stable, so
+            # ties keep their file order): per-user reductions scan sequential
+            # blocks and progression needs no re-sort
+            _self._responses_df = _self._responses_df.sort_values(
+                ['id_user_hash', 'exam_created_at'], kind='stable', ignore_index=True
+            )
             
         return _self._responses_df.copy()
     
+    @st.cache_data
+    def load_hot_responses(_self) -> pd.DataFrame:
+        """
+        Load a narrow view of the responses for the overview aggregations.
+        
+        Only the columns the KPI and trend passes scan, each as one compact
+        contiguous array, so cache hits copy a fraction of the full frame.
+        
+        Returns:
+            DataFrame with date (category), hour (nullable Int16, <NA> without
+            an exam time), is_correct (int8) and uid (int32 user code, -1 when missing)
+        """
+        responses_df = _self.load_responses()
+        return pd.DataFrame({
+            'date': responses_df['date'],
+            'hour': responses_df['hour'],
+            'is_correct': responses_df['is_correct'].to_numpy(dtype=np.int8),
+            'uid': responses_df['id_user_hash'].cat.codes.to_numpy(dtype=np.int32),
+        })
+    
+    def load_responses_for_progression(self, min_attempts: int, max_users: int) -> pd.DataFrame:
+        """
+        Load only the responses of users eligible for progression analysis.
+        
+        Users qualify with at least min_attempts responses; the max_users most
+        active of them are kept (ties broken by user id). Qualification is decided from
+        per-user counts over the categorical codes, and because responses are
+        stored sorted by user, each selected user's rows are one contiguous
+        block located from the counts alone (no per-row membership test).
+        
+        Args:
+            min_attempts: Minimum number of responses per user
+            max_users: Maximum number of qualifying users to return, keeping the most active
+            
+        Returns:
+            Responses of the selected users, sorted by user then exam time
+        """
+        # Use the returned frame: on a cache hit load_responses' body doesn't
+        # run, so self._responses_df may never have been filled on this instance
+        responses_df = self.load_responses()
+        
+        user = responses_df['id_user_hash']
+        codes = user.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(user.cat.categories))
+        
+        # Block offsets: users appear in code order, rows without a user sort last
+        block_starts = np.cumsum(counts) - counts
+        # Top max_users qualifying users by volume (partial selection), then back
+        # in code order so the blocks are read front to back
+        qualified = pd.Series(counts).loc[lambda c: c >= min_attempts]
+        selected = np.sort(qualified.nlargest(max_users).index.to_numpy())
+        lengths = counts[selected]
+        rows = (
+            np.arange(lengths.sum())
+            + np.repeat(block_starts[selected] - (np.cumsum(lengths) - lengths), lengths)
+        )
+        
+        # Already in (user, time) order from load_responses
+        return responses_df.take(rows).reset_index(drop=True)
+    
     @st.cache_data
     def load_full_dataset(_self) -> pd.DataFrame:
         """
@@ -79,38 +194,88 @@ class DataLoader:
         
         return _self._full_df.copy()
     
+    def get_data_version(self) -> Tuple[Tuple[str, int], ...]:
+        """
+        Get a cheap, hashable identifier for the current contents of the data files.
+        
+        Returns:
+            Tuple of (file path, modification time in ns) for each dataset, suitable
+            as a cache key for results derived from the loaded data
+        """
+        paths = [
+            self.data_dir / "rc_invokana_cases.csv",
+            self.data_dir / "rc_invokana_users_responses_nopersonal_hash.csv"
+        ]
+        return tuple(
+            (str(path), path.stat().st_mtime_ns if path.exists() else 0)
+            for path in paths
+        )
+    
     def get_summary_stats(self) -> dict:
         """
         Get summary statistics for the dashboard.
         
+        Cached per data version, so the sidebar and the overview section share
+        one computation across reruns.
+        
         Returns:
             Dictionary containing key metrics
         """
-        responses_df = self.load_responses()
-        cases_df = self.load_cases()
-        
-        # Calculate question duplication metrics
-        unique_question_texts = cases_df['question'].nunique()
-        question_duplication = cases_df.groupby('question')['id_question'].nunique()
-        duplicated_questions = (question_duplication > 1).sum()
-        
-        return {
-            'total_responses': len(responses_df),
-            'unique_users': responses_df['id_user_hash'].nunique(),
-            'unique_questions': responses_df['id_question'].nunique(),
-            'unique_question_texts': unique_question_texts,
-            'duplicated_questions': duplicated_questions,
-            'duplication_rate': duplicated_questions / unique_question_texts if unique_question_texts > 0 else 0,
-            'unique_cases': cases_df['id_case'].nunique(),
-            'overall_accuracy': responses_df['is_correct'].mean(),
-            'date_range': {
-                'start': responses_df['exam_created_at'].min(),
-                'end': responses_df['exam_created_at'].max()
-            },
-            'countries': responses_df['country_user_made_the_exam'].nunique(),
-            'categories': cases_df['category_name'].nunique(),
-            'subcategories': cases_df['subcategory_name'].nunique()
-        }
+        return _summary_stats(self.get_data_version(), self)
+
+
+@st.cache_data(show_spinner=False)
+def _summary_stats(data_version: tuple, _loader: DataLoader) -> dict:
+    """Compute DataLoader.get_summary_stats() once per data version."""
+    responses_df = _loader.load_responses()
+    cases_df = _loader.load_cases()
+    
+    # Distinct counts, one nunique call per dataset
+    case_counts = cases_df[_CASES_DISTINCT].nunique()
+    response_counts = responses_df[_RESPONSES_DISTINCT].nunique()
+    
+    # Calculate question duplication metrics
+    unique_question_texts = int(case_counts['question'])
+    question_duplication = cases_df.groupby('question')['id_question'].nunique()
+    duplicated_questions = (question_duplication > 1).sum()
+    
+    # Date span, rates and their display strings, so renders only interpolate
+    start = responses_df['exam_created_at'].min()
+    end = responses_df['exam_created_at'].max()
+    duration_days = (end - start).days
+    start_str = start.strftime('%Y-%m-%d')
+    end_str = end.strftime('%Y-%m-%d')
+    unique_users = int(response_counts['id_user_hash'])
+    avg_per_day = len(responses_df) / max(duration_days, 1)
+    avg_per_user = len(responses_df) / max(unique_users, 1)
+    
+    return {
+        'total_responses': len(responses_df),
+        'unique_users': unique_users,
+        'unique_questions': int(response_counts['id_question']),
+        'unique_question_texts': unique_question_texts,
+        'duplicated_questions': duplicated_questions,
+        'duplication_rate': duplicated_questions / unique_question_texts if unique_question_texts > 0 else 0,
+        'unique_cases': int(case_counts['id_case']),
+        'overall_accuracy': responses_df['is_correct'].mean(),
+        'date_range': {
+            'start': start,
+            'end': end
+        },
+        'start_str': start_str,
+        'end_str': end_str,
+        'date_range_str': f"{start_str} to {end_str}",
+        'duration_days': duration_days,
+        'avg_responses_per_day': avg_per_day,
+        'avg_per_day_str': f"{avg_per_day:.1f}",
+        'avg_per_user_str': f"{avg_per_user:.1f}",
+        'countries': int(response_counts['country_user_made_the_exam']),
+        'categories': int(case_counts['category_name']),
+        'subcategories': int(case_counts['subcategory_name']),
+        'total_case_rows': len(cases_df),
+        'unique_exams': int(case_counts['id_exam']),
+        'case_question_ids': int(case_counts['id_question'])
+    }
 
 
 # Global instance for easy access
@@ -477,7 +477,7 @@ RECOMMENDATIONS
         
         # User distribution
         ax2 = fig.add_subplot(gs[1, :])
-        user_responses = responses_df.groupby('id_user_hash').size()
+        user_responses = responses_df.groupby('id_user_hash', observed=True).size()
         
         bins = [0, 5, 10, 20, 50, 100, 1000]
         labels = ['1-5', '6-10', '11-20', '21-50', '51-100', '100+']
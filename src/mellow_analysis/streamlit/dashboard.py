@@ -88,7 +88,7 @@ def main():
         try:
             stats = data_loader.get_summary_stats()
             st.sidebar.success(f"✅ Data loaded successfully!")
-            st.sidebar.info(f"📅 Data range: {stats['date_range']['start'].strftime('%Y-%m-%d')} to {stats['date_range']['end'].strftime('%Y-%m-%d')}")
+            st.sidebar.info(f"📅 Data range: {stats['date_range_str']}")
         except Exception as e:
             st.error(f"❌ Error loading data: {str(e)}")
             st.stop()
@@ -159,7 +159,7 @@ def main():
         - Confidence intervals shown where sample sizes are small
         - Segmentation based on percentile thresholds for robustness
         
-        **Last Updated:** {stats['date_range']['end'].strftime('%Y-%m-%d')}
+        **Last Updated:** {stats['end_str']}
         """)
 
 
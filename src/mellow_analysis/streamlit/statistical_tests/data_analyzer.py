@@ -72,19 +72,21 @@ class DataTypeAnalyzer:
                 is_suitable_for_grouping=False
             )
         
-        unique_values = series.unique().tolist()
-        value_counts = series.value_counts().to_dict()
+        # One hashing pass gives the uniques (in order of appearance) and their counts
+        counts = series.value_counts(sort=False)
+        unique_values = counts.index.tolist()
+        value_counts = counts.sort_values(ascending=False).to_dict()
         
         # Determine data type
-        if self._is_continuous(series):
+        if self._is_continuous(series, unique_count=len(counts)):
             return VariableInfo(
                 name=column,
                 display_name=column,
                 data_type='continuous',
                 unique_values=unique_values,
                 value_counts=value_counts,
-                min_value=float(series.min()),
-                max_value=float(series.max()),
+                min_value=float(counts.index.min()),
+                max_value=float(counts.index.max()),
                 mean_value=float(series.mean()),
                 is_suitable_for_grouping=True
             )
@@ -107,12 +109,13 @@ class DataTypeAnalyzer:
                 is_suitable_for_grouping=self._is_suitable_categorical(value_counts)
             )
     
-    def _is_continuous(self, series: pd.Series) -> bool:
+    def _is_continuous(self, series: pd.Series, unique_count: int = None) -> bool:
         """Check if a variable should be treated as continuous."""
         if not pd.api.types.is_numeric_dtype(series):
             return False
         
-        unique_count = series.nunique()
+        if unique_count is None:
+            unique_count = series.nunique()
         total_count = len(series)
         
         # If more than 10 unique values or more than 50% of values are unique
@@ -21,24 +21,7 @@ def prepare_user_level_data(data_loader) -> pd.DataFrame:
     responses_df = data_loader.load_responses()
     
     # Aggregate user-level statistics
-    user_stats = responses_df.groupby('id_user_hash').agg({
-        'is_correct': ['mean', 'count', 'sum'],
-        'user_hospital': 'first',
-        'user_specialty': 'first', 
-        'user_subspecialty': 'first',
-        'user_education_level': 'first',
-        'user_gender': 'first',
-        'user_age_range': 'first',
-        'country_user_made_the_exam': 'first',
-        'exam_created_at': ['min', 'max']
-    }).reset_index()
-    
-    # Flatten column names
-    user_stats.columns = [
-        'user_id', 'accuracy', 'total_responses', 'correct_responses',
-        'hospital', 'specialty', 'subspecialty', 'education_level',
-        'gender', 'age_range', 'country', 'first_exam', 'last_exam'
-    ]
+    user_stats = _aggregate_by_user(responses_df)
     
     # Calculate derived metrics
     user_stats['days_active'] = (
@@ -49,35 +32,134 @@ def prepare_user_level_data(data_loader) -> pd.DataFrame:
         user_stats['total_responses'] / user_stats['days_active']
     )
     
+    # Downcast the metrics (their ranges fit easily) to halve the bytes
+    # moved by later filtering, hashing and plotting
+    user_stats = user_stats.astype(_USER_METRIC_DTYPES)
+    
     # Clean and standardize categorical variables
     user_stats = _clean_categorical_variables(user_stats)
     
     return user_stats
 
 
+# Compact dtypes for the aggregated per-user metrics. responses_per_day stays
+# float64: its ratios (1/3, 2/3, ...) sit on the outlier fences in
+# validate_data_quality, and float32 rounding would flip them
+_USER_METRIC_DTYPES = {
+    'accuracy': np.float32,
+    'total_responses': np.int32,
+    'correct_responses': np.int32,
+}
+
+# Profile columns taken from each user's first non-null response, with their output names
+_USER_FIRST_COLUMNS = {
+    'user_hospital': 'hospital',
+    'user_specialty': 'specialty',
+    'user_subspecialty': 'subspecialty',
+    'user_education_level': 'education_level',
+    'user_gender': 'gender',
+    'user_age_range': 'age_range',
+    'country_user_made_the_exam': 'country',
+}
+
+
+# Education-level keywords (lowercase) and their simplified category, in priority order
+_EDUCATION_KEYWORDS = {
+    'residente': 'Resident',
+    'especialista': 'Specialist',
+    'estudiante': 'Student',
+}
+
+
+def _aggregate_by_user(responses_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce response rows to one row per user with plain numpy column reductions.
+    
+    Users are factorized once (sorted, matching groupby order) and the rows are
+    stably sorted by user code (skipped when the loader already grouped them,
+    which it does), so every per-user reduction works on contiguous
+    segments: counts and sums via bincount, first non-null values via segment
+    starts, and exam date min/max via reduceat on int64 nanoseconds.
+    """
+    codes, user_ids = pd.factorize(responses_df['id_user_hash'], sort=True)
+    valid = codes >= 0  # groupby drops missing user ids
+    n_users = len(user_ids)
+    order = np.flatnonzero(valid)
+    sorted_codes = codes[order]
+    if np.any(sorted_codes[1:] < sorted_codes[:-1]):
+        order = order[np.argsort(sorted_codes, kind='stable')]
+        sorted_codes = codes[order]
+    
+    # Accuracy, response count and correct count
+    total_responses = np.bincount(sorted_codes, minlength=n_users)
+    correct_responses = np.bincount(
+        sorted_codes, weights=responses_df['is_correct'].to_numpy()[order], minlength=n_users
+    ).astype(np.int64)
+    
+    user_stats = {
+        'user_id': user_ids.to_numpy(),
+        'accuracy': correct_responses / total_responses,
+        'total_responses': total_responses,
+        'correct_responses': correct_responses,
+    }
+    
+    for column, name in _USER_FIRST_COLUMNS.items():
+        user_stats[name] = _first_valid(sorted_codes, responses_df[column].to_numpy()[order], n_users)
+    
+    # First and last exam timestamps
+    exam_times = responses_df['exam_created_at'].to_numpy()[order]
+    has_time = ~np.isnat(exam_times)
+    time_codes = sorted_codes[has_time]
+    times_ns = exam_times[has_time].view('i8')
+    starts = _segment_starts(time_codes)
+    first_exam = np.full(n_users, np.datetime64('NaT'), dtype=exam_times.dtype)
+    last_exam = first_exam.copy()
+    if starts.size:
+        first_exam[time_codes[starts]] = np.minimum.reduceat(times_ns, starts).view(exam_times.dtype)
+        last_exam[time_codes[starts]] = np.maximum.reduceat(times_ns, starts).view(exam_times.dtype)
+    user_stats['first_exam'] = first_exam
+    user_stats['last_exam'] = last_exam
+    
+    return pd.DataFrame(user_stats)
+
+
+def _segment_starts(sorted_codes: np.ndarray) -> np.ndarray:
+    """Positions where a new group begins in an array of sorted group codes."""
+    if sorted_codes.size == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+
+
+def _first_valid(sorted_codes: np.ndarray, sorted_values: np.ndarray, n_groups: int) -> np.ndarray:
+    """First non-null value per group (None for all-null groups), like groupby 'first'."""
+    notna = pd.notna(sorted_values)
+    codes = sorted_codes[notna]
+    values = sorted_values[notna]
+    starts = _segment_starts(codes)
+    
+    first = np.full(n_groups, None, dtype=object)
+    first[codes[starts]] = values[starts]
+    return first
+
+
 def _clean_categorical_variables(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean and standardize categorical variables."""
-    df = df.copy()
+    """
+    Clean and standardize categorical variables.
     
+    Columns are replaced in place: the caller passes the freshly aggregated
+    frame it owns, so copying every column first would be wasted work.
+    """
     # Standardize education levels
     if 'education_level' in df.columns:
         df['education_level'] = df['education_level'].fillna('Unknown')
         
-        # Create simplified education categories
-        def simplify_education(education):
-            if pd.isna(education):
-                return 'Unknown'
-            education_str = str(education).lower()
-            if 'residente' in education_str:
-                return 'Resident'
-            elif 'especialista' in education_str:
-                return 'Specialist'
-            elif 'estudiante' in education_str:
-                return 'Student'
-            else:
-                return 'Other'
-        
-        df['education_simplified'] = df['education_level'].apply(simplify_education)
+        # Create simplified education categories (first matching keyword wins)
+        education = df['education_level'].astype(str).str.lower()
+        df['education_simplified'] = np.select(
+            [education.str.contains(keyword, regex=False) for keyword in _EDUCATION_KEYWORDS],
+            list(_EDUCATION_KEYWORDS.values()),
+            default='Other'
+        )
     
     # Clean hospital names
     if 'hospital' in df.columns:
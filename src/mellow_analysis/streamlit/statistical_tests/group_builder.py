@@ -4,39 +4,283 @@ Group building functionality for flexible statistical comparisons.
 
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Any, Optional
+import numpy as np
 import pandas as pd
 import streamlit as st
 from .data_analyzer import VariableInfo
 
+# Variable types rendered as multiselect widgets in the group builder
+_CATEGORICAL_TYPES = frozenset({'categorical', 'ordinal'})
 
-@dataclass
+# Number of row masks each GroupDefinition keeps memoized
+_MASK_CACHE_SIZE = 8
+
+# Largest magnitude representable in float32; larger outcomes stay float64
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# Session-state slot and size of the memoized group preview summaries
+_PREVIEW_CACHE_KEY = '_group_previews'
+_PREVIEW_CACHE_SIZE = 16
+
+
+def _lru_get(cache: Dict, key: Any, compute, max_size: int) -> Any:
+    """
+    Look up key in a dict used as an LRU cache, computing and storing it on a miss.
+    
+    Dicts keep insertion order, so hits are moved to the end and the first
+    entry is the least recently used one.
+    """
+    value = cache.pop(key, None)
+    if value is None:
+        value = compute()
+        if len(cache) >= max_size:
+            cache.pop(next(iter(cache)))
+    cache[key] = value
+    return value
+
+
+def set_frame_fingerprint(df: pd.DataFrame, fingerprint: int) -> None:
+    """
+    Tag df with a precomputed content fingerprint used as its cache identity.
+    
+    The tag records id(df), so frames derived from df (which inherit attrs)
+    are not mistaken for it and fall back to their own object identity.
+    """
+    df.attrs['fingerprint'] = (fingerprint, id(df))
+
+
+def _frame_fingerprint(df: pd.DataFrame) -> Optional[int]:
+    """Content fingerprint set on df by set_frame_fingerprint, or None if it has none."""
+    tag = df.attrs.get('fingerprint')
+    if tag is not None and tag[1] == id(df):
+        return tag[0]
+    return None
+
+
+def _frame_identity(df: pd.DataFrame) -> Optional[Tuple[int, Tuple[int, int]]]:
+    """
+    Cheap cache key for a DataFrame plus its shape (skips content hashing).
+    
+    Uses the content fingerprint set by set_frame_fingerprint, so keys stay
+    stable across reruns where Streamlit hands back a fresh copy of the same
+    cached frame. Returns None for frames without one: object identity is no
+    substitute, as CPython reuses id() values once a frame is freed.
+    """
+    fingerprint = _frame_fingerprint(df)
+    if fingerprint is None:
+        return None
+    return fingerprint, df.shape
+
+
+def _compute_filter_mask(df: pd.DataFrame,
+                         categorical_items: Tuple[Tuple[str, List[Any]], ...],
+                         continuous_items: Tuple[Tuple[str, Tuple[float, float]], ...]) -> np.ndarray:
+    """Compute the boolean row mask (1 byte/row) matching a filter spec."""
+    columns = {column: df[column].to_numpy() for column, _ in categorical_items + continuous_items}
+    return _columns_mask(columns, len(df), categorical_items, continuous_items)
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _shared_filter_mask(fingerprint: int, shape: Tuple[int, int],
+                        categorical_items: Tuple[Tuple[str, List[Any]], ...],
+                        continuous_items: Tuple[Tuple[str, Tuple[float, float]], ...],
+                        _df: pd.DataFrame) -> np.ndarray:
+    """
+    Filter mask cached across reruns and sessions, keyed on the frame's content fingerprint.
+    
+    Returns a mask rather than a DataFrame to avoid caching (and pickling) a
+    copy of the filtered rows.
+    """
+    return _compute_filter_mask(_df, categorical_items, continuous_items)
+
+
+def _filter_mask(df: pd.DataFrame,
+                 categorical_items: Tuple[Tuple[str, List[Any]], ...],
+                 continuous_items: Tuple[Tuple[str, Tuple[float, float]], ...]) -> np.ndarray:
+    """
+    Compute the boolean row mask matching a filter spec, cached when df is fingerprinted.
+    
+    Frames without a content fingerprint are filtered uncached: the process-wide
+    cache can't key them on id(), which CPython reuses after garbage collection.
+    """
+    fingerprint = _frame_fingerprint(df)
+    if fingerprint is None:
+        return _compute_filter_mask(df, categorical_items, continuous_items)
+    return _shared_filter_mask(fingerprint, df.shape, categorical_items, continuous_items, df)
+
+
+@dataclass(slots=True)
+class SortedColumn:
+    """A continuous column pre-sorted once, so range filters become two binary searches."""
+    sorted_values: np.ndarray
+    order: np.ndarray
+    
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'SortedColumn':
+        order = np.argsort(values, kind='stable')
+        return cls(sorted_values=values[order], order=order)
+    
+    def __len__(self) -> int:
+        return len(self.order)
+    
+    def range_mask(self, min_val: float, max_val: float) -> np.ndarray:
+        """Boolean mask of rows with min_val <= value <= max_val (NaNs sort last and never match)."""
+        i_lo = np.searchsorted(self.sorted_values, min_val, side='left')
+        i_hi = np.searchsorted(self.sorted_values, max_val, side='right')
+        mask = np.zeros(len(self.order), dtype=bool)
+        mask[self.order[i_lo:i_hi]] = True
+        return mask
+
+
+def _columns_mask(columns: Dict[str, np.ndarray], n_rows: int,
+                  categorical_items: Tuple[Tuple[str, List[Any]], ...],
+                  continuous_items: Tuple[Tuple[str, Tuple[float, float]], ...]) -> np.ndarray:
+    """
+    Compute the boolean row mask for a filter spec from pre-extracted column arrays.
+    
+    Categorical columns may be given as pd.Categorical, in which case the selected
+    values are mapped to category codes and matched with a lookup-table isin on
+    the (int8/int16) codes array. Continuous columns may be given as SortedColumn
+    to resolve each range with binary searches instead of two full comparisons.
+    """
+    mask = np.ones(n_rows, dtype=bool)
+    
+    # Apply categorical filters
+    for column, values in categorical_items:
+        if not values:  # Only apply if values are selected
+            continue
+        col = columns[column]
+        if isinstance(col, pd.Categorical):
+            code_ids = col.categories.get_indexer(list(values))
+            mask &= np.isin(col.codes, code_ids[code_ids >= 0], kind='table')
+        else:
+            mask &= pd.Series(col, copy=False).isin(values).to_numpy()
+    
+    # Apply continuous filters
+    for column, (min_val, max_val) in continuous_items:
+        col = columns[column]
+        if isinstance(col, SortedColumn):
+            mask &= col.range_mask(min_val, max_val)
+        else:
+            mask &= (col >= min_val) & (col <= max_val)
+    
+    return mask
+
+
+def _prepare_outcome(df: pd.DataFrame, outcome_variable: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the outcome column as a numpy array plus its not-NaN mask.
+    
+    For fingerprinted frames the pair is kept in st.session_state so every group
+    extraction against the same data reuses one column lookup and NaN scan.
+    Entries are tagged with the fingerprint and rebuilt when other data is
+    passed in. Frames without a fingerprint are converted each time, since
+    id() values are reused once a frame is freed.
+    
+    The array is downcast to float32 (halving the bytes the tests sort and scan)
+    unless its values would overflow float32.
+    """
+    identity = _frame_identity(df)
+    if identity is None:
+        return _outcome_arrays(df, outcome_variable)
+    
+    key = f'_outcome_{outcome_variable}'
+    cached = st.session_state.get(key)
+    if cached is not None and cached[0] == identity:
+        return cached[1], cached[2]
+    
+    arr, notna = _outcome_arrays(df, outcome_variable)
+    st.session_state[key] = (identity, arr, notna)
+    return arr, notna
+
+
+def _outcome_arrays(df: pd.DataFrame, outcome_variable: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Outcome column as float32 (float64 if it would overflow) plus its not-NaN mask."""
+    arr = df[outcome_variable].to_numpy(dtype=np.float64, na_value=np.nan)
+    notna = ~np.isnan(arr)
+    if not notna.any() or np.abs(arr[notna]).max() <= _FLOAT32_MAX:
+        arr = arr.astype(np.float32)
+    return arr, notna
+
+
+@dataclass(slots=True)
 class GroupDefinition:
     """Defines a group for statistical comparison."""
     name: str
-    categorical_filters: Dict[str, List[Any]] = field(default_factory=dict)
-    continuous_filters: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    categorical_filters: Optional[Dict[str, List[Any]]] = None
+    continuous_filters: Optional[Dict[str, Tuple[float, float]]] = None
     size: int = 0
     description: str = ""
+    # Memoized row masks keyed by (dataframe fingerprint, filter spec)
+    _mask_cache: Dict[Any, np.ndarray] = field(init=False, repr=False, compare=False)
+    # (dataframe fingerprint, filter spec) that self.size was last computed for
+    _size_key: Optional[Tuple[Any, ...]] = field(init=False, repr=False, compare=False)
     
-    def apply_filters(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Apply all filters and return filtered dataframe."""
-        mask = pd.Series(True, index=df.index)
-        
-        # Apply categorical filters
-        for column, values in self.categorical_filters.items():
-            if values:  # Only apply if values are selected
-                mask &= df[column].isin(values)
+    def __post_init__(self):
+        """Allocate the filter dicts and mask cache for this instance."""
+        if self.categorical_filters is None:
+            self.categorical_filters = {}
+        if self.continuous_filters is None:
+            self.continuous_filters = {}
+        self._mask_cache = {}
+        self._size_key = None
+    
+    @property
+    def is_defined(self) -> bool:
+        """Whether any filter has been set on this group."""
+        return bool(self.categorical_filters or self.continuous_filters)
+    
+    def signature(self) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+        """Return a hashable, order-independent description of the filters."""
+        return (
+            tuple(sorted((var, tuple(values)) for var, values in self.categorical_filters.items())),
+            tuple(sorted((var, tuple(bounds)) for var, bounds in self.continuous_filters.items()))
+        )
+    
+    def compute_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Return the boolean row mask selecting this group's rows in df.
         
-        # Apply continuous filters  
-        for column, (min_val, max_val) in self.continuous_filters.items():
-            mask &= (df[column] >= min_val) & (df[column] <= max_val)
+        Masks of fingerprinted frames are memoized per instance (LRU, keyed on the
+        fingerprint and filter signature), so the preview, validation and
+        prediction steps of a rerun share one mask instead of re-filtering the
+        full frame each time. Other frames are filtered on every call.
+        """
+        signature = self.signature()
+        identity = _frame_identity(df)
+        if identity is None:
+            return _filter_mask(df, *signature)
+        return _lru_get(self._mask_cache, (identity, signature),
+                        lambda: _filter_mask(df, *signature), _MASK_CACHE_SIZE)
+    
+    def apply_filters_mask(self, cols_np: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Return the boolean row mask for this group from pre-extracted columns.
         
-        return df[mask]
+        Args:
+            cols_np: Column name -> numpy array (or pd.Categorical for categorical
+                filters, SortedColumn for continuous ones), covering at least every
+                filtered column; all columns share the same length
+        """
+        n_rows = len(next(iter(cols_np.values())))
+        return _columns_mask(cols_np, n_rows, *self.signature())
+    
+    def apply_filters(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply all filters and return filtered dataframe."""
+        # No filters selects every row; callers don't mutate, so skip the copy
+        if not self.is_defined:
+            return df
+        return df.take(np.flatnonzero(self.compute_mask(df)))
     
     def validate(self, df: pd.DataFrame, min_size: int = 10) -> Dict[str, Any]:
         """Validate the group definition."""
-        filtered_df = self.apply_filters(df)
-        self.size = len(filtered_df)
+        # Only recount when the data or the filters changed since the last call
+        # (always for frames without a fingerprint, which have no stable key)
+        identity = _frame_identity(df)
+        size_key = (identity, self.signature()) if identity is not None else None
+        if size_key is None or self._size_key != size_key:
+            self.size = int(np.count_nonzero(self.compute_mask(df)))
+            self._size_key = size_key
         
         return {
             'is_valid': self.size >= min_size,
@@ -51,7 +295,7 @@ class GroupDefinition:
         if self.size < min_size:
             warnings.append(f"Group size ({self.size}) is below minimum ({min_size})")
         
-        if not self.categorical_filters and not self.continuous_filters:
+        if not self.is_defined:
             warnings.append("No filters defined - group will include all users")
         
         return warnings
@@ -87,20 +331,25 @@ class GroupBuilder:
             name: info for name, info in variables.items() 
             if info.is_suitable_for_grouping
         }
+        
+        # Split grouping variables by widget type once, not on every rerun
+        self._cat_vars = {
+            name: info for name, info in self.grouping_vars.items()
+            if info.data_type in _CATEGORICAL_TYPES
+        }
+        self._cont_vars = {
+            name: info for name, info in self.grouping_vars.items()
+            if info.data_type == 'continuous'
+        }
     
     def render_group_builder(self, group_name: str, key_prefix: str) -> GroupDefinition:
         """Render interactive group builder UI."""
         group_def = GroupDefinition(name=group_name)
         
         # Categorical variable selection
-        categorical_vars = {
-            name: info for name, info in self.grouping_vars.items() 
-            if info.data_type in ['categorical', 'ordinal']
-        }
-        
-        if categorical_vars:
+        if self._cat_vars:
             st.markdown("**Categorical Variables**")
-            for var_name, var_info in categorical_vars.items():
+            for var_name, var_info in self._cat_vars.items():
                 selected_values = st.multiselect(
                     f"{var_info.display_name}",
                     options=var_info.unique_values,
@@ -111,49 +360,42 @@ class GroupBuilder:
                     group_def.categorical_filters[var_name] = selected_values
         
         # Continuous variable selection
-        continuous_vars = {
-            name: info for name, info in self.grouping_vars.items() 
-            if info.data_type == 'continuous'
-        }
-        
-        if continuous_vars:
+        if self._cont_vars:
             st.markdown("**Continuous Variables**")
-            for var_name, var_info in continuous_vars.items():
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    min_val = st.number_input(
-                        f"{var_info.display_name} (min)",
-                        min_value=var_info.min_value,
-                        max_value=var_info.max_value,
-                        value=var_info.min_value,
-                        key=f"{key_prefix}_{var_name}_min"
-                    )
-                
-                with col2:
-                    max_val = st.number_input(
-                        f"{var_info.display_name} (max)",
-                        min_value=var_info.min_value,
-                        max_value=var_info.max_value,
-                        value=var_info.max_value,
-                        key=f"{key_prefix}_{var_name}_max"
-                    )
-                
-                if min_val < max_val:
-                    group_def.continuous_filters[var_name] = (min_val, max_val)
-                else:
-                    st.error(f"Invalid range for {var_info.display_name}: min must be less than max")
+            for var_name, var_info in self._cont_vars.items():
+                # A constant column has no range to pick (st.slider rejects
+                # min == max), so show its value and leave it unfiltered
+                if var_info.min_value == var_info.max_value:
+                    st.caption(f"{var_info.display_name}: all users have {var_info.min_value:g}")
+                    continue
+                # A single range slider returns an ordered (min, max) tuple
+                min_val, max_val = st.slider(
+                    f"{var_info.display_name} range",
+                    min_value=float(var_info.min_value),
+                    max_value=float(var_info.max_value),
+                    value=(float(var_info.min_value), float(var_info.max_value)),
+                    key=f"{key_prefix}_{var_name}_range"
+                )
+                group_def.continuous_filters[var_name] = (min_val, max_val)
         
         return group_def
     
     def render_group_preview(self, group_def: GroupDefinition, df: pd.DataFrame, 
-                           outcome_var: str = None) -> None:
-        """Render compact group statistics."""
+                           outcome_var: str = None, data_key: Any = None) -> None:
+        """
+        Render compact group statistics.
+        
+        Args:
+            data_key: Optional stable identifier of df's contents (e.g. its
+                content fingerprint). When given, the preview summary is memoized in
+                st.session_state by data_key, outcome and filters, so a group whose
+                filters did not change skips recomputing it on reruns.
+        """
         validation = group_def.validate(df)
         
         # Always show basic stats if we have users and outcome variable
         if validation['size'] > 0 and outcome_var:
-            self._render_compact_stats(group_def, df, outcome_var)
+            self._render_compact_stats(group_def, df, outcome_var, data_key)
         elif validation['size'] == 0:
             st.info("👆 Select filters to define this group")
         
@@ -162,71 +404,110 @@ class GroupBuilder:
             st.caption(f"⚠️ {warning}")
     
     def _render_compact_stats(self, group_def: GroupDefinition, df: pd.DataFrame, 
-                            outcome_var: str) -> None:
+                            outcome_var: str, data_key: Any = None) -> None:
         """Render essential group statistics in a natural, conversational format."""
         try:
-            # Get group data
-            group_data = group_def.apply_filters(df)
-            if outcome_var not in group_data.columns:
-                return
-                
-            outcome_values = group_data[outcome_var].dropna()
-            if len(outcome_values) < 3:
-                st.warning(f"⚠️ Only {len(outcome_values)} values (need ≥3 for analysis)")
+            if outcome_var not in df.columns:
                 return
             
-            # Natural language summary instead of clinical metrics
-            mean_val = outcome_values.mean()
-            std_val = outcome_values.std()
-            count = len(outcome_values)
+            if data_key is None:
+                summary = self._compact_stats(group_def, df, outcome_var)
+            else:
+                cache = st.session_state.setdefault(_PREVIEW_CACHE_KEY, {})
+                summary = _lru_get(
+                    cache, (data_key, outcome_var, group_def.signature()),
+                    lambda: self._compact_stats(group_def, df, outcome_var),
+                    _PREVIEW_CACHE_SIZE
+                )
+            
+            count = summary['count']
+            if count < 3:
+                st.warning(f"⚠️ Only {count} values (need ≥3 for analysis)")
+                return
             
             # Create contextual description
-            description = f"**{count:,} users** with average score of **{mean_val:.2f}** (spread: ±{std_val:.2f})"
+            description = f"**{count:,} users** with average score of **{summary['mean']:.2f}** (spread: ±{summary['std']:.2f})"
             st.markdown(description)
             
             # Single normality indicator with natural language
-            from scipy import stats
-            try:
-                _, shapiro_p = stats.shapiro(outcome_values)
-                is_normal = shapiro_p > 0.05
-                
-                if is_normal:
-                    st.caption("✅ Data follows normal distribution (good for t-tests)")
-                else:
-                    st.caption("⚠️ Data is non-normal (will use rank-based test)")
-            except:
+            if summary['is_normal'] is None:
                 st.caption("🔍 Cannot assess data distribution")
+            elif summary['is_normal']:
+                st.caption("✅ Data follows normal distribution (good for t-tests)")
+            else:
+                st.caption("⚠️ Data is non-normal (will use rank-based test)")
             
         except Exception as e:
             st.caption(f"Error calculating statistics: {str(e)}")
     
-    def validate_groups(self, group_a: GroupDefinition, group_b: GroupDefinition, 
-                       df: pd.DataFrame) -> Dict[str, Any]:
-        """Validate that two groups are suitable for comparison."""
-        group_a_data = group_a.apply_filters(df)
-        group_b_data = group_b.apply_filters(df)
-        
-        # Check for overlap
-        overlap_users = set(group_a_data.index) & set(group_b_data.index)
-        has_overlap = len(overlap_users) > 0
-        
-        # Calculate balance ratio
-        size_ratio = min(len(group_a_data), len(group_b_data)) / max(len(group_a_data), len(group_b_data)) if max(len(group_a_data), len(group_b_data)) > 0 else 0
-        
-        validation = {
-            'group_a_size': len(group_a_data),
-            'group_b_size': len(group_b_data),
-            'has_overlap': has_overlap,
-            'overlap_count': len(overlap_users),
-            'size_ratio': size_ratio,
-            'is_balanced': size_ratio >= 0.3,  # Groups shouldn't differ by more than 3:1
-            'total_users': len(group_a_data) + len(group_b_data) - len(overlap_users)
-        }
+    def _compact_stats(self, group_def: GroupDefinition, df: pd.DataFrame,
+                       outcome_var: str) -> Dict[str, Any]:
+        """Compute the count, mean, spread and normality shown in a group preview."""
+        # Index the outcome column positionally instead of copying every
+        # column of the group's rows and then dropping all but one
+        outcome_col, notna = _prepare_outcome(df, outcome_var)
+        outcome_values = outcome_col[group_def.compute_mask(df) & notna]
         
-        validation['is_valid'] = (
-            validation['group_a_size'] >= 10 and 
-            validation['group_b_size'] >= 10 and
-            not validation['has_overlap']
-        )
+        summary = {'count': outcome_values.size}
+        if outcome_values.size < 3:
+            return summary
+        
+        # Natural language summary instead of clinical metrics
+        summary['mean'] = outcome_values.mean(dtype=np.float64)
+        summary['std'] = outcome_values.std(ddof=1, dtype=np.float64)
+        
+        from .statistical_engine import _normality_test
+        try:
+            _, normality_p = _normality_test(outcome_values)
+            summary['is_normal'] = normality_p > 0.05
+        except Exception:
+            summary['is_normal'] = None
         
-        return validation 
\ No newline at end of file
+        return summary
+    
+    def validate_groups(self, group_a: GroupDefinition, group_b: GroupDefinition, 
+                       df: pd.DataFrame,
+                       masks: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
+        """
+        Validate that two groups are suitable for comparison.
+        
+        Args:
+            masks: Optional precomputed (mask_a, mask_b) row masks over df
+        """
+        if masks is None:
+            masks = (group_a.compute_mask(df), group_b.compute_mask(df))
+        return validate_group_masks(*masks)
+
+
+def validate_group_masks(mask_a: np.ndarray, mask_b: np.ndarray) -> Dict[str, Any]:
+    """Validate two groups given their boolean row masks over the same DataFrame."""
+    size_a = int(np.count_nonzero(mask_a))
+    size_b = int(np.count_nonzero(mask_b))
+    
+    # Check for overlap: pack both masks to bits (8 rows per byte) and
+    # popcount their intersection
+    packed_a = np.packbits(mask_a)
+    packed_b = np.packbits(mask_b)
+    overlap_count = int(np.bitwise_count(packed_a & packed_b).sum())
+    has_overlap = overlap_count > 0
+    
+    # Calculate balance ratio
+    size_ratio = min(size_a, size_b) / max(size_a, size_b) if max(size_a, size_b) > 0 else 0
+    
+    validation = {
+        'group_a_size': size_a,
+        'group_b_size': size_b,
+        'has_overlap': has_overlap,
+        'overlap_count': overlap_count,
+        'size_ratio': size_ratio,
+        'is_balanced': size_ratio >= 0.3,  # Groups shouldn't differ by more than 3:1
+        'total_users': size_a + size_b - overlap_count
+    }
+    
+    validation['is_valid'] = (
+        validation['group_a_size'] >= 10 and 
+        validation['group_b_size'] >= 10 and
+        not validation['has_overlap']
+    )
+    
+    return validation
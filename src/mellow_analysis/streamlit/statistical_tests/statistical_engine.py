@@ -3,17 +3,192 @@ Statistical test execution and analysis engine.
 """
 
 from dataclasses import dataclass
-from typing import Dict, Any, Tuple
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 from scipy import stats
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from .group_builder import GroupDefinition
+from .group_builder import GroupDefinition, _prepare_outcome
 
+# Cohen's d magnitude labels and the |d| thresholds separating them
+_EFFECT_MAGNITUDES = ("Negligible", "Small", "Medium", "Large")
+_EFFECT_THRESHOLDS = np.array([0.2, 0.5, 0.8])
+_NO_VARIATION = -1
 
-@dataclass
+# Evidence wording for a p-value, indexed by how many of the engine's
+# thresholds (0.001, 0.01, alpha, 0.1) it reaches
+_SIGNIFICANCE_LABELS = np.array([
+    "very strong evidence of a difference",
+    "strong evidence of a difference",
+    "moderate evidence of a difference",
+    "weak evidence of a difference",
+    "no significant evidence of a difference",
+])
+
+# Elements per block when streaming group moments (256 KB of float32)
+_MOMENT_BLOCK = 1 << 16
+
+# Shapiro-Wilk is unreliable (and slow) beyond this many samples: the test
+# prediction checks normality on a deterministic subsample, and full-sample
+# checks switch to D'Agostino-Pearson, which is a single O(n) moment pass
+_NORMALITY_MAX_N = 5000
+_NORMALITY_SEED = 0
+
+# Mann-Whitney U switches to the tie-corrected normal approximation once both
+# groups reach this size; smaller groups keep SciPy's 'auto' (exact when valid)
+_MWU_ASYMPTOTIC_MIN_N = 20
+
+
+def select_mwu_method(n_a: int, n_b: int, allow_asymptotic: bool = True) -> str:
+    """Return the scipy.stats.mannwhitneyu method to use for the given group sizes."""
+    if allow_asymptotic and min(n_a, n_b) >= _MWU_ASYMPTOTIC_MIN_N:
+        return 'asymptotic'
+    return 'auto'
+
+
+def _mann_whitney_asymptotic(data_a: np.ndarray, data_b: np.ndarray) -> Tuple[float, float]:
+    """
+    Two-sided Mann-Whitney U with the tie-corrected normal approximation.
+    
+    Matches stats.mannwhitneyu(method='asymptotic'), but the pooled sample is
+    sorted once and both the midranks and the tie counts come from that sort.
+    """
+    n_a, n_b = data_a.size, data_b.size
+    n = n_a + n_b
+    pooled = np.concatenate([data_a, data_b])
+    order = np.argsort(pooled, kind='stable')
+    
+    # Runs of tied values and their midranks (1-based)
+    ordered = pooled[order]
+    run_starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    tie_counts = np.diff(np.r_[run_starts, n])
+    midranks = run_starts + (tie_counts + 1) / 2
+    ranks = np.empty(n)
+    ranks[order] = np.repeat(midranks, tie_counts)
+    
+    u_a = ranks[:n_a].sum() - n_a * (n_a + 1) / 2
+    u = max(u_a, n_a * n_b - u_a)
+    
+    tie_term = (tie_counts ** 3 - tie_counts).sum()
+    sigma = np.sqrt(n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (u - n_a * n_b / 2 - 0.5) / sigma
+    p_value = float(np.clip(2 * stats.norm.sf(z), 0, 1))
+    return float(u_a), p_value
+
+
+@lru_cache(maxsize=64)
+def _cached_normality(payload: bytes, dtype: str) -> Tuple[float, float]:
+    """Shapiro-Wilk on a serialized (already subsampled) array, memoized by content."""
+    stat, p = stats.shapiro(np.frombuffer(payload, dtype=dtype))
+    return float(stat), float(p)
+
+
+def normality_test_name(n: int) -> str:
+    """Name of the normality test _normality_test runs for a sample of size n."""
+    return "D'Agostino-Pearson" if n > _NORMALITY_MAX_N else "Shapiro-Wilk"
+
+
+def _normality_test(values: np.ndarray) -> Tuple[float, float]:
+    """Shapiro-Wilk, or D'Agostino-Pearson (stats.normaltest) beyond _NORMALITY_MAX_N values."""
+    if values.size > _NORMALITY_MAX_N:
+        stat, p = stats.normaltest(values)
+    else:
+        stat, p = stats.shapiro(values)
+    return float(stat), float(p)
+
+
+def _subsampled_normality(values: np.ndarray) -> Tuple[float, float]:
+    """
+    Shapiro-Wilk on at most _NORMALITY_MAX_N values.
+    
+    Larger groups are subsampled with a fixed seed so the same group always
+    gets the same result, and results are cached across reruns.
+    """
+    if values.size > _NORMALITY_MAX_N:
+        rng = np.random.default_rng(_NORMALITY_SEED)
+        values = rng.choice(values, _NORMALITY_MAX_N, replace=False)
+    return _cached_normality(values.tobytes(), values.dtype.str)
+
+
+def _moments(values: np.ndarray) -> Tuple[int, float, float]:
+    """
+    Return (count, mean, sum of squared deviations) in one streaming pass.
+    
+    Each cache-sized block gets its own mean and squared deviations (the
+    two-pass form, but over data already in cache), and blocks are merged
+    with the Welford/Chan update, so the array is read from memory once.
+    """
+    n, mean, m2 = 0, 0.0, 0.0
+    for start in range(0, values.size, _MOMENT_BLOCK):
+        block = values[start:start + _MOMENT_BLOCK]
+        n_b = block.size
+        mean_b = float(block.mean(dtype=np.float64))
+        dev = block - mean_b
+        m2_b = float(np.dot(dev, dev))
+        
+        if n == 0:
+            n, mean, m2 = n_b, mean_b, m2_b
+            continue
+        
+        total = n + n_b
+        delta = mean_b - mean
+        mean += delta * n_b / total
+        m2 += m2_b + delta * delta * n * n_b / total
+        n = total
+    return n, mean, m2
+
+
+def _cohens_d(data_a: np.ndarray, data_b: np.ndarray,
+              moments: Optional[Tuple[Tuple[int, float, float], ...]] = None) -> Tuple[float, int]:
+    """
+    Compute Cohen's d and its magnitude code directly on numpy arrays.
+    
+    Accumulates in float64 regardless of the input dtype. The magnitude code
+    indexes _EFFECT_MAGNITUDES, or is _NO_VARIATION when the pooled std is zero.
+    Pass moments (from _moments) to skip re-reading the arrays.
+    """
+    if moments is None:
+        moments = (_moments(data_a), _moments(data_b))
+    (n1, mean1, m2_a), (n2, mean2, m2_b) = moments
+    
+    pooled_std = np.sqrt((m2_a + m2_b) / (n1 + n2 - 2))
+    if pooled_std == 0:
+        return 0.0, _NO_VARIATION
+    
+    cohens_d = float((mean1 - mean2) / pooled_std)
+    magnitude_code = int(np.searchsorted(_EFFECT_THRESHOLDS, abs(cohens_d), side='right'))
+    return cohens_d, magnitude_code
+
+
+def _describe(values: np.ndarray) -> Dict[str, Any]:
+    """
+    Summary statistics for one group, reading the array as few times as possible.
+    
+    Count, mean and spread come from one streaming _moments pass; min, quartiles
+    and max come from a single np.quantile call, which partitions a copy once.
+    """
+    n, mean, m2 = _moments(values)
+    minimum, q1, median, q3, maximum = np.quantile(values, [0, 0.25, 0.5, 0.75, 1])
+    return {
+        'n': n, 'mean': mean, 'm2': m2,
+        'std': np.sqrt(m2 / (n - 1)) if n > 1 else np.nan,
+        'min': minimum, 'q1': q1, 'median': median, 'q3': q3, 'max': maximum,
+    }
+
+
+@dataclass(slots=True)
+class TestDiagnosis:
+    """Predicted test for two groups, with reusable assumption checks (if any)."""
+    test_name: str
+    reason: str
+    assumptions: Optional[Dict[str, Any]]
+
+
+@dataclass(slots=True)
 class TestResult:
     """Results from a statistical test."""
     test_name: str
@@ -24,6 +199,7 @@ class TestResult:
     interpretation: str
     assumptions: Dict[str, Any]
     sample_sizes: Dict[str, int]
+    mwu_method: Optional[str] = None
 
 
 class StatisticalTestEngine:
@@ -31,19 +207,48 @@ class StatisticalTestEngine:
     
     def __init__(self, alpha: float = 0.05):
         self.alpha = alpha
+        # Edges between the _SIGNIFICANCE_LABELS bands (alpha must lie in [0.001, 0.1])
+        self._p_thresholds = np.array([0.001, 0.01, alpha, 0.1])
     
-    def compare_groups(self, group_a: GroupDefinition, group_b: GroupDefinition, 
-                      df: pd.DataFrame, outcome_variable: str) -> TestResult:
-        """Compare two groups on a specified outcome variable."""
-        # Extract data for each group
+    def prepare_outcome_arrays(self, group_a: GroupDefinition, group_b: GroupDefinition,
+                               df: pd.DataFrame, outcome_variable: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract the outcome arrays for both groups in a single filter pass.
+        
+        The result can be passed to compare_groups and create_comparison_visualizations
+        so the filter + dropna pipeline runs once per comparison instead of once per call.
+        """
         data_a = self._extract_outcome_data(group_a, df, outcome_variable)
         data_b = self._extract_outcome_data(group_b, df, outcome_variable)
+        return data_a, data_b
+    
+    def compare_groups(self, group_a: GroupDefinition, group_b: GroupDefinition, 
+                      df: pd.DataFrame, outcome_variable: str,
+                      data: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                      assumptions: Optional[Dict[str, Any]] = None,
+                      mwu_method: Optional[str] = None) -> TestResult:
+        """
+        Compare two groups on a specified outcome variable.
+        
+        Args:
+            data: Optional precomputed (data_a, data_b) from prepare_outcome_arrays
+            assumptions: Optional precomputed assumption checks from diagnose
+            mwu_method: Mann-Whitney U method; defaults to select_mwu_method()
+        """
+        # Extract data for each group
+        if data is None:
+            data = self.prepare_outcome_arrays(group_a, group_b, df, outcome_variable)
+        data_a, data_b = data
+        if mwu_method is None:
+            mwu_method = select_mwu_method(data_a.size, data_b.size)
         
         # Check assumptions
-        assumptions = self._check_assumptions(data_a, data_b, group_a.name, group_b.name)
+        if assumptions is None:
+            assumptions = self._check_assumptions(data_a, data_b, group_a.name, group_b.name)
         
         # Select and execute appropriate test
-        test_result = self._execute_test(data_a, data_b, assumptions)
+        test_result = self._execute_test(data_a, data_b, assumptions, group_a.name, group_b.name,
+                                         mwu_method)
         
         # Calculate effect size
         effect_size, effect_magnitude = self._calculate_effect_size(data_a, data_b)
@@ -59,25 +264,40 @@ class StatisticalTestEngine:
             effect_magnitude=effect_magnitude,
             interpretation=interpretation,
             assumptions=assumptions,
-            sample_sizes={group_a.name: len(data_a), group_b.name: len(data_b)}
+            sample_sizes={group_a.name: data_a.size, group_b.name: data_b.size},
+            mwu_method=test_result['mwu_method']
         )
     
     def _extract_outcome_data(self, group_def: GroupDefinition, df: pd.DataFrame, 
-                             outcome_variable: str) -> pd.Series:
-        """Extract outcome data for a group."""
-        filtered_df = group_def.apply_filters(df)
-        return filtered_df[outcome_variable].dropna()
+                             outcome_variable: str) -> np.ndarray:
+        """
+        Extract outcome data for a group as a contiguous array.
+        
+        The outcome column is already downcast to float32 by _prepare_outcome
+        (float64 only if it would overflow), so this is a single boolean gather.
+        """
+        arr, notna = _prepare_outcome(df, outcome_variable)
+        return arr[np.logical_and(group_def.compute_mask(df), notna)]
     
-    def _check_assumptions(self, data_a: pd.Series, data_b: pd.Series, 
-                          name_a: str, name_b: str) -> Dict[str, Any]:
-        """Check statistical test assumptions."""
+    def _check_assumptions(self, data_a: np.ndarray, data_b: np.ndarray, 
+                          name_a: str, name_b: str, subsample: bool = False) -> Dict[str, Any]:
+        """
+        Check statistical test assumptions.
+        
+        Args:
+            subsample: Run normality checks on a cached, bounded-size subsample
+        """
         assumptions = {}
         
         # Normality tests
-        for data, name in [(data_a, name_a), (data_b, name_b)]:
-            if len(data) >= 3:
-                stat, p = stats.shapiro(data)
+        normality_test = _subsampled_normality if subsample else _normality_test
+        normality = [normality_test(data) if len(data) >= 3 else None for data in (data_a, data_b)]
+        
+        for data, name, result in [(data_a, name_a, normality[0]), (data_b, name_b, normality[1])]:
+            if result is not None:
+                stat, p = result
                 assumptions[f'{name}_normality'] = {
+                    'test': "Shapiro-Wilk" if subsample else normality_test_name(len(data)),
                     'statistic': stat,
                     'p_value': p,
                     'is_normal': p > 0.05,
@@ -110,12 +330,13 @@ class StatisticalTestEngine:
         
         return assumptions
     
-    def _execute_test(self, data_a: pd.Series, data_b: pd.Series, 
-                     assumptions: Dict[str, Any]) -> Dict[str, Any]:
+    def _execute_test(self, data_a: np.ndarray, data_b: np.ndarray, 
+                     assumptions: Dict[str, Any], name_a: str, name_b: str,
+                     mwu_method: str = 'auto') -> Dict[str, Any]:
         """Execute the appropriate statistical test."""
-        # Get normality results
-        norm_a = assumptions.get(f'{data_a.name}_normality', {}).get('is_normal', False)
-        norm_b = assumptions.get(f'{data_b.name}_normality', {}).get('is_normal', False)
+        # Get normality results (keyed by group name, see _check_assumptions)
+        norm_a = assumptions.get(f'{name_a}_normality', {}).get('is_normal', False)
+        norm_b = assumptions.get(f'{name_b}_normality', {}).get('is_normal', False)
         equal_var = assumptions.get('equal_variances', {}).get('equal_variances', False)
         
         both_normal = norm_a and norm_b
@@ -123,55 +344,43 @@ class StatisticalTestEngine:
         if both_normal and equal_var:
             statistic, p_value = stats.ttest_ind(data_a, data_b, equal_var=True)
             test_name = "Student's t-test"
+            mwu_method = None
         elif both_normal and not equal_var:
             statistic, p_value = stats.ttest_ind(data_a, data_b, equal_var=False)
             test_name = "Welch's t-test"
+            mwu_method = None
+        elif mwu_method == 'asymptotic':
+            statistic, p_value = _mann_whitney_asymptotic(data_a, data_b)
+            test_name = "Mann-Whitney U test"
         else:
-            statistic, p_value = stats.mannwhitneyu(data_a, data_b, alternative='two-sided')
+            statistic, p_value = stats.mannwhitneyu(data_a, data_b, alternative='two-sided',
+                                                    method=mwu_method)
             test_name = "Mann-Whitney U test"
         
-        return {'test_name': test_name, 'statistic': statistic, 'p_value': p_value}
+        return {'test_name': test_name, 'statistic': statistic, 'p_value': p_value,
+                'mwu_method': mwu_method}
     
-    def _calculate_effect_size(self, data_a: pd.Series, data_b: pd.Series) -> Tuple[float, str]:
+    def _calculate_effect_size(self, data_a: np.ndarray, data_b: np.ndarray,
+                               moments: Optional[Tuple[Tuple[int, float, float], ...]] = None
+                               ) -> Tuple[float, str]:
         """Calculate Cohen's d effect size."""
         if len(data_a) < 2 or len(data_b) < 2:
             return 0.0, "Cannot calculate"
         
-        n1, n2 = len(data_a), len(data_b)
-        mean1, mean2 = data_a.mean(), data_b.mean()
-        var1, var2 = data_a.var(ddof=1), data_b.var(ddof=1)
+        cohens_d, magnitude_code = _cohens_d(data_a, data_b, moments)
         
-        pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
-        
-        if pooled_std == 0:
+        if magnitude_code == _NO_VARIATION:
             return 0.0, "No variation"
         
-        cohens_d = (mean1 - mean2) / pooled_std
-        
-        abs_d = abs(cohens_d)
-        if abs_d < 0.2:
-            magnitude = "Negligible"
-        elif abs_d < 0.5:
-            magnitude = "Small"
-        elif abs_d < 0.8:
-            magnitude = "Medium"
-        else:
-            magnitude = "Large"
-        
-        return cohens_d, magnitude
+        return cohens_d, _EFFECT_MAGNITUDES[magnitude_code]
+    
+    def interpret_p_values(self, p_values) -> np.ndarray:
+        """Evidence wording for each p-value (scalar or array), in one searchsorted lookup."""
+        return _SIGNIFICANCE_LABELS[np.searchsorted(self._p_thresholds, p_values, side='right')]
     
     def _interpret_results(self, p_value: float, effect_magnitude: str) -> str:
         """Generate interpretation of statistical results."""
-        if p_value < 0.001:
-            significance = "very strong evidence of a difference"
-        elif p_value < 0.01:
-            significance = "strong evidence of a difference"
-        elif p_value < self.alpha:
-            significance = "moderate evidence of a difference"
-        elif p_value < 0.1:
-            significance = "weak evidence of a difference"
-        else:
-            significance = "no significant evidence of a difference"
+        significance = self.interpret_p_values(p_value)
         
         if effect_magnitude.lower() in ['large', 'medium']:
             practical = "with meaningful practical significance"
@@ -182,90 +391,86 @@ class StatisticalTestEngine:
         
         return f"Results show {significance} (p={p_value:.4f}) {practical} (effect size: {effect_magnitude.lower()})."
     
-    def _select_test(self, data_a: pd.Series, data_b: pd.Series) -> str:
-        """Select the appropriate statistical test based on data characteristics."""
-        if len(data_a) < 3 or len(data_b) < 3:
-            return "Insufficient data"
+    def diagnose(self, data_a: np.ndarray, data_b: np.ndarray,
+                 name_a: str = "Group A", name_b: str = "Group B") -> TestDiagnosis:
+        """
+        Check assumptions once and derive the test that compare_groups will run.
         
-        try:
-            # Check normality for both groups
-            _, p_a = stats.shapiro(data_a)
-            _, p_b = stats.shapiro(data_b)
-            
-            both_normal = p_a > 0.05 and p_b > 0.05
-            
-            if both_normal:
-                # Check equal variances
-                _, p_levene = stats.levene(data_a, data_b)
-                equal_variances = p_levene > 0.05
-                
-                if equal_variances:
-                    return "Student's t-test"
-                else:
-                    return "Welch's t-test"
-            else:
-                return "Mann-Whitney U test"
-                
-        except Exception:
-            return "Mann-Whitney U test"
-    
-    def _get_test_reason(self, data_a: pd.Series, data_b: pd.Series) -> str:
-        """Get the reason why a particular test was selected."""
+        Normality is checked on a cached subsample of large groups, so the
+        returned assumptions are only set (for reuse by compare_groups) when no
+        subsampling was needed; the final analysis always tests the full sample.
+        """
         if len(data_a) < 3 or len(data_b) < 3:
-            return "Not enough data"
+            return TestDiagnosis("Insufficient data", "Not enough data", None)
         
         try:
-            # Check normality for both groups
-            _, p_a = stats.shapiro(data_a)
-            _, p_b = stats.shapiro(data_b)
-            
-            both_normal = p_a > 0.05 and p_b > 0.05
-            
-            if both_normal:
-                # Check equal variances
-                _, p_levene = stats.levene(data_a, data_b)
-                equal_variances = p_levene > 0.05
-                
-                if equal_variances:
-                    return "Both groups normal + equal variances"
-                else:
-                    return "Both groups normal + unequal variances"
-            else:
-                return "Non-normal distribution detected"
-                
+            assumptions = self._check_assumptions(data_a, data_b, name_a, name_b, subsample=True)
         except Exception:
-            return "Data quality issues detected"
+            return TestDiagnosis("Mann-Whitney U test", "Data quality issues detected", None)
+        
+        if max(len(data_a), len(data_b)) > _NORMALITY_MAX_N:
+            reusable = None
+        else:
+            reusable = assumptions
+        
+        both_normal = (assumptions[f'{name_a}_normality']['is_normal'] and
+                       assumptions[f'{name_b}_normality']['is_normal'])
+        
+        if not both_normal:
+            return TestDiagnosis("Mann-Whitney U test", "Non-normal distribution detected", reusable)
+        if assumptions['equal_variances']['equal_variances']:
+            return TestDiagnosis("Student's t-test", "Both groups normal + equal variances", reusable)
+        return TestDiagnosis("Welch's t-test", "Both groups normal + unequal variances", reusable)
 
     def create_comparison_visualizations(self, group_a: GroupDefinition, group_b: GroupDefinition,
                                        df: pd.DataFrame, outcome_variable: str, 
-                                       outcome_display_name: str) -> go.Figure:
-        """Create comprehensive comparison visualizations."""
-        data_a = self._extract_outcome_data(group_a, df, outcome_variable)
-        data_b = self._extract_outcome_data(group_b, df, outcome_variable)
+                                       outcome_display_name: str,
+                                       data: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> go.Figure:
+        """
+        Create comprehensive comparison visualizations.
+        
+        Args:
+            data: Optional precomputed (data_a, data_b) from prepare_outcome_arrays
+        """
+        if data is None:
+            data = self.prepare_outcome_arrays(group_a, group_b, df, outcome_variable)
+        data_a, data_b = data
         
         fig = make_subplots(
             rows=2, cols=2,
             subplot_titles=['Distribution Comparison', 'Box Plot Comparison', 
                           'Statistical Summary', 'Effect Size Visualization'],
-            specs=[[{'type': 'histogram'}, {'type': 'box'}],
+            specs=[[{'type': 'bar'}, {'type': 'box'}],
                    [{'type': 'table'}, {'type': 'bar'}]]
         )
         
-        # Histograms
-        fig.add_trace(go.Histogram(x=data_a, name=group_a.name, opacity=0.6, nbinsx=20), row=1, col=1)
-        fig.add_trace(go.Histogram(x=data_b, name=group_b.name, opacity=0.6, nbinsx=20), row=1, col=1)
+        # One summary pass per group feeds every panel below
+        described = [_describe(data_a), _describe(data_b)]
+        
+        # Histograms: bin on the Python side with shared edges so only the
+        # bin centers and counts are sent to the browser, not the raw arrays.
+        # The edges only depend on the overall range, so the groups are never
+        # concatenated
+        dtype = np.result_type(data_a, data_b)
+        value_range = (dtype.type(min(described[0]['min'], described[1]['min'])),
+                       dtype.type(max(described[0]['max'], described[1]['max'])))
+        edges = np.histogram_bin_edges(np.empty(0, dtype=dtype), bins=20, range=value_range)
+        centers = (edges[:-1] + edges[1:]) / 2
+        for data, name in [(data_a, group_a.name), (data_b, group_b.name)]:
+            counts, _ = np.histogram(data, bins=edges)
+            fig.add_trace(go.Bar(x=centers, y=counts, name=name, opacity=0.6), row=1, col=1)
         
-        # Box plots
-        fig.add_trace(go.Box(y=data_a, name=group_a.name, showlegend=False), row=1, col=2)
-        fig.add_trace(go.Box(y=data_b, name=group_b.name, showlegend=False), row=1, col=2)
+        # Box plots from precomputed quartiles and fences
+        for data, name, desc in [(data_a, group_a.name, described[0]),
+                                 (data_b, group_b.name, described[1])]:
+            fig.add_trace(go.Box(name=name, showlegend=False, **self._box_summary(data, desc)),
+                          row=1, col=2)
         
         # Summary table
         summary_stats = pd.DataFrame({
             'Statistic': ['Count', 'Mean', 'Median', 'Std Dev', 'Min', 'Max'],
-            group_a.name: [len(data_a), f"{data_a.mean():.3f}", f"{data_a.median():.3f}",
-                          f"{data_a.std():.3f}", f"{data_a.min():.3f}", f"{data_a.max():.3f}"],
-            group_b.name: [len(data_b), f"{data_b.mean():.3f}", f"{data_b.median():.3f}",
-                          f"{data_b.std():.3f}", f"{data_b.min():.3f}", f"{data_b.max():.3f}"]
+            **{name: [desc['n']] + [f"{desc[key]:.3f}" for key in ('mean', 'median', 'std', 'min', 'max')]
+               for name, desc in [(group_a.name, described[0]), (group_b.name, described[1])]}
         })
         
         fig.add_trace(go.Table(
@@ -274,11 +479,28 @@ class StatisticalTestEngine:
         ), row=2, col=1)
         
         # Effect size
-        effect_size, _ = self._calculate_effect_size(data_a, data_b)
+        effect_size, _ = self._calculate_effect_size(
+            data_a, data_b, tuple((desc['n'], desc['mean'], desc['m2']) for desc in described)
+        )
         fig.add_trace(go.Bar(
             x=['Effect Size (Cohen\'s d)'], y=[abs(effect_size)], 
             name='Effect Size', showlegend=False
         ), row=2, col=2)
         
         fig.update_layout(height=800, title=f"{outcome_display_name}: {group_a.name} vs {group_b.name}")
-        return fig 
\ No newline at end of file
+        return fig 
+    
+    def _box_summary(self, data: np.ndarray, described: Dict[str, Any]) -> Dict[str, list]:
+        """Compute the box plot statistics (quartiles and 1.5 IQR fences) for a group."""
+        q1, median, q3 = described['q1'], described['median'], described['q3']
+        iqr = q3 - q1
+        
+        # Fences are the most extreme data points within 1.5 IQR of the box
+        lower_fence = data[data >= q1 - 1.5 * iqr].min()
+        upper_fence = data[data <= q3 + 1.5 * iqr].max()
+        
+        return {
+            'q1': [q1], 'median': [median], 'q3': [q3],
+            'lowerfence': [lower_fence], 'upperfence': [upper_fence],
+            'mean': [described['mean']]
+        }
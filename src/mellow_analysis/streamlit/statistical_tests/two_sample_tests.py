@@ -7,13 +7,119 @@ variables and continuous ranges, with automated statistical test selection.
 
 import streamlit as st
 import pandas as pd
-from typing import Optional
+import numpy as np
+from typing import Optional, Tuple
 from scipy import stats
 
 from .data_analyzer import DataTypeAnalyzer, VariableInfo
 from .data_preparation import prepare_user_level_data, validate_data_quality
-from .group_builder import GroupBuilder, GroupDefinition
-from .statistical_engine import StatisticalTestEngine, TestResult
+from .group_builder import (
+    GroupBuilder, GroupDefinition, SortedColumn, _prepare_outcome, set_frame_fingerprint,
+    validate_group_masks
+)
+from .statistical_engine import (
+    StatisticalTestEngine, TestDiagnosis, TestResult, select_mwu_method,
+    _EFFECT_MAGNITUDES, _EFFECT_THRESHOLDS
+)
+
+
+# One-line p-value interpretations, indexed by how many thresholds p reaches
+_P_MESSAGES = (
+    "Very strong evidence against chance",
+    "Strong evidence against chance",
+    "Moderate evidence against chance",
+    "Little to no evidence against chance",
+)
+
+
+@st.cache_resource
+def _get_analyzer() -> DataTypeAnalyzer:
+    """Shared, stateless variable analyzer (one instance per process)."""
+    return DataTypeAnalyzer()
+
+
+@st.cache_resource
+def _get_engine(alpha: float = 0.05) -> StatisticalTestEngine:
+    """Shared statistical engine per significance level (one instance per process)."""
+    return StatisticalTestEngine(alpha=alpha)
+
+
+@st.cache_data(show_spinner=False)
+def _prepare_user_data(data_version: tuple, _data_loader) -> tuple:
+    """
+    Build, validate and fingerprint the user-level dataset once per data version.
+    
+    The loader argument is underscore-prefixed so Streamlit does not hash it;
+    data_version (file paths + mtimes) is the cache key. The returned content
+    fingerprint is the cache key for every helper downstream of user_df.
+    """
+    user_df = prepare_user_level_data(_data_loader)
+    df_fp = int(pd.util.hash_pandas_object(user_df, index=False).sum())
+    return user_df, validate_data_quality(user_df), df_fp
+
+
+@st.cache_data(show_spinner=False)
+def _analyze_variables(df_fp: int, _user_df: pd.DataFrame) -> tuple:
+    """Classify the user-level variables once per dataset fingerprint."""
+    analyzer = _get_analyzer()
+    variables = analyzer.analyze_dataset(_user_df)
+    return (
+        variables,
+        analyzer.get_grouping_variables(variables),
+        analyzer.get_outcome_variables(variables)
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _categorical_column(df_fp: int, column: str, _user_df: pd.DataFrame) -> pd.Categorical:
+    """
+    Convert a grouping column to a Categorical once per dataset (filters then match on codes).
+    
+    Held as a shared resource rather than pickled per hit, so reruns reuse the
+    same codes; callers only read it.
+    """
+    return pd.Categorical(_user_df[column])
+
+
+@st.cache_resource(show_spinner=False)
+def _sorted_column(df_fp: int, column: str, _user_df: pd.DataFrame) -> SortedColumn:
+    """
+    Sort a continuous grouping column once per dataset (range filters then binary-search it).
+    
+    Shared like _categorical_column: range_mask only reads the sorted values
+    and order, so no per-rerun copy is needed.
+    """
+    return SortedColumn.from_values(_user_df[column].to_numpy())
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _validate_groups(sig_a: tuple, sig_b: tuple, df_fp: int, _masks: tuple) -> dict:
+    """
+    Validate the two groups once per (filters, dataset fingerprint).
+    
+    The validation is a pure function of both filter signatures and the data,
+    so the masks themselves are not hashed.
+    """
+    return validate_group_masks(*_masks)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _run(sig_a: tuple, sig_b: tuple, outcome_var: str, df_fp: int,
+         mwu_method: str, _group_a: GroupDefinition, _group_b: GroupDefinition,
+         _user_df: pd.DataFrame, _outcome_data: tuple, _assumptions: Optional[dict]) -> TestResult:
+    """
+    Run the group comparison once per (filters, outcome, dataset fingerprint, MWU method).
+    
+    Alpha is deliberately not part of the key: it only changes the wording of
+    the interpretation, which the caller redoes for the selected alpha, so
+    changing the significance level never reruns the tests.
+    Underscore-prefixed arguments are derived from the hashed ones and are not hashed.
+    """
+    engine = _get_engine()
+    return engine.compare_groups(
+        _group_a, _group_b, _user_df, outcome_var, data=_outcome_data,
+        assumptions=_assumptions, mwu_method=mwu_method
+    )
 
 
 def render_two_sample_tests(data_loader):
@@ -22,11 +128,12 @@ def render_two_sample_tests(data_loader):
     st.header("🧪 Two-Sample Statistical Tests")
     st.caption("Compare any two groups using automatically selected statistical tests")
     
-    # Step 1: Data Preparation
+    # Step 1: Data Preparation (cached per data version across reruns)
     with st.spinner("Preparing data for analysis..."):
         try:
-            user_df = prepare_user_level_data(data_loader)
-            data_validation = validate_data_quality(user_df)
+            data_version = data_loader.get_data_version()
+            user_df, data_validation, df_fp = _prepare_user_data(data_version, data_loader)
+            set_frame_fingerprint(user_df, df_fp)
         except Exception as e:
             st.error(f"Error preparing data: {str(e)}")
             return
@@ -63,10 +170,7 @@ def render_two_sample_tests(data_loader):
     
     # Step 2: Analyze Variables
     with st.spinner("Analyzing variables..."):
-        analyzer = DataTypeAnalyzer()
-        variables = analyzer.analyze_dataset(user_df)
-        grouping_variables = analyzer.get_grouping_variables(variables)
-        outcome_variables = analyzer.get_outcome_variables(variables)
+        variables, grouping_variables, outcome_variables = _analyze_variables(df_fp, user_df)
     
     if not grouping_variables:
         st.error("No suitable grouping variables found in the dataset.")
@@ -106,6 +210,9 @@ def render_two_sample_tests(data_loader):
         st.warning("Please select an outcome variable to continue.")
         return
     
+    # Outcome column and its not-NaN mask, extracted once per rerun
+    outcome_np, notna_mask = _prepare_outcome(user_df, outcome_var)
+    
     # Group building
     st.subheader("Define Groups")
     st.caption("Build two groups for comparison with live diagnostics")
@@ -119,19 +226,33 @@ def render_two_sample_tests(data_loader):
         st.markdown("### 👥 Group A")
         with st.expander("🔧 Define Filters", expanded=True):
             group_a = group_builder.render_group_builder("Group A", "group_a")
-        group_builder.render_group_preview(group_a, user_df, outcome_var)
+        group_builder.render_group_preview(group_a, user_df, outcome_var, data_key=df_fp)
     
     with col_b:
         st.markdown("### 👥 Group B") 
         with st.expander("🔧 Define Filters", expanded=True):
             group_b = group_builder.render_group_builder("Group B", "group_b")
-        group_builder.render_group_preview(group_b, user_df, outcome_var)
+        group_builder.render_group_preview(group_b, user_df, outcome_var, data_key=df_fp)
+    
+    # Numpy views of every column the groups filter on (plus the outcome),
+    # extracted once so the prediction works on masks instead of DataFrames.
+    # Categorical filter columns are passed as cached Categoricals (matched on
+    # their integer codes) and continuous ones as cached sorted columns (ranges
+    # resolved by binary search).
+    categorical_columns = set(group_a.categorical_filters) | set(group_b.categorical_filters)
+    continuous_columns = set(group_a.continuous_filters) | set(group_b.continuous_filters)
+    cols_np = {outcome_var: user_df[outcome_var].to_numpy()}
+    for column in categorical_columns:
+        cols_np[column] = _categorical_column(df_fp, column, user_df)
+    for column in continuous_columns:
+        cols_np[column] = _sorted_column(df_fp, column, user_df)
     
     # Step 5: Group Validation and Test Prediction
-    if (group_a.categorical_filters or group_a.continuous_filters) and \
-       (group_b.categorical_filters or group_b.continuous_filters):
+    if group_a.is_defined and group_b.is_defined:
         
-        validation = group_builder.validate_groups(group_a, group_b, user_df)
+        # Row masks for both groups, shared by validation and test prediction
+        masks = (group_a.apply_filters_mask(cols_np), group_b.apply_filters_mask(cols_np))
+        validation = _validate_groups(group_a.signature(), group_b.signature(), df_fp, masks)
         
         # Simplified validation messages
         if validation['has_overlap']:
@@ -142,8 +263,12 @@ def render_two_sample_tests(data_loader):
             st.error("❌ Each group needs at least 10 users. Please adjust your filters.")
             return
         
+        # Outcome values for both groups, gathered once from the shared masks
+        # and reused by the prediction, the analysis and the plots
+        outcome_data = (outcome_np[masks[0] & notna_mask], outcome_np[masks[1] & notna_mask])
+        
         # Show predicted test and balance in a cleaner way
-        _show_test_prediction_compact(group_a, group_b, user_df, outcome_var, validation)
+        diagnosis = _show_test_prediction_compact(group_a, group_b, outcome_data, validation)
     
     else:
         st.info("👆 Please define both groups to proceed with the analysis.")
@@ -154,56 +279,90 @@ def render_two_sample_tests(data_loader):
         
         with st.spinner("Running statistical analysis..."):
             # Initialize statistical engine
-            engine = StatisticalTestEngine(alpha=alpha)
+            engine = _get_engine(alpha)
+            
+            mwu_method = select_mwu_method(
+                outcome_data[0].size, outcome_data[1].size,
+                allow_asymptotic=st.session_state.get('mwu_asymptotic', True)
+            )
             
-            # Run the comparison
+            # Run the comparison (cached, so repeated clicks with unchanged inputs are instant)
             try:
-                result = engine.compare_groups(
-                    group_a, group_b, user_df, outcome_var
-                )
-                
-                # Display results
-                _display_test_results_simplified(result, group_a, group_b, alpha)
-                
-                # Create and display visualizations
-                outcome_info = outcome_variables[outcome_var]
-                fig = engine.create_comparison_visualizations(
-                    group_a, group_b, user_df, outcome_var, outcome_info.display_name
+                result = _run(
+                    group_a.signature(), group_b.signature(), outcome_var, df_fp,
+                    mwu_method, group_a, group_b, user_df, outcome_data, diagnosis.assumptions
                 )
-                
-                st.subheader("📊 Visual Analysis")
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Display detailed assumptions
-                _display_statistical_assumptions(result.assumptions)
-                
-            except Exception as e:
+            except (ValueError, RuntimeError) as e:
                 st.error(f"Error running statistical test: {str(e)}")
+                return
+            
+            # Only the wording depends on alpha
+            result.interpretation = engine._interpret_results(
+                result.p_value, result.effect_magnitude
+            )
+        
+        # Display results
+        _display_test_results_simplified(result, group_a, group_b, alpha)
+        
+        # Create and display visualizations
+        outcome_info = outcome_variables[outcome_var]
+        _render_viz(engine, group_a, group_b, user_df, outcome_var,
+                    outcome_info.display_name, outcome_data)
+        
+        # Display detailed assumptions
+        _display_statistical_assumptions(result.assumptions, result.mwu_method)
+
+
+@st.fragment
+def _render_viz(engine: StatisticalTestEngine, group_a: GroupDefinition, group_b: GroupDefinition,
+                df: pd.DataFrame, outcome_var: str, outcome_display_name: str,
+                outcome_data: tuple) -> None:
+    """
+    Render the comparison plots in a fragment.
+    
+    Toggling the plots only reruns this fragment, and the figure is only built
+    (and serialized to the browser) while the plots are shown.
+    """
+    st.subheader("📊 Visual Analysis")
+    st.toggle("Show plots", value=True, key="show_viz")
+    
+    if not st.session_state.get("show_viz", True):
+        return
+    
+    fig = engine.create_comparison_visualizations(
+        group_a, group_b, df, outcome_var, outcome_display_name, data=outcome_data
+    )
+    fig.update_layout(uirevision="keep")
+    st.plotly_chart(fig, use_container_width=True)
 
 
 def _show_test_prediction_compact(group_a: GroupDefinition, group_b: GroupDefinition, 
-                                df: pd.DataFrame, outcome_var: str, validation: dict) -> None:
-    """Show test prediction and balance info in a compact format."""
+                                outcome_data: Tuple[np.ndarray, np.ndarray],
+                                validation: dict) -> TestDiagnosis:
+    """
+    Show test prediction and balance info in a compact format.
     
-    # Get group data for prediction
-    group_a_data = group_a.apply_filters(df)[outcome_var].dropna()
-    group_b_data = group_b.apply_filters(df)[outcome_var].dropna()
+    Returns the diagnosis so the analysis can reuse its assumption checks.
+    """
+    engine = _get_engine()
+    group_a_data, group_b_data = outcome_data
     
-    # Predict test
-    engine = StatisticalTestEngine()
-    predicted_test = engine._select_test(group_a_data, group_b_data)
+    # Predict test (assumptions are checked once here)
+    diagnosis = engine.diagnose(group_a_data, group_b_data, group_a.name, group_b.name)
     
     # Compact status display
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.info(f"🔬 **{predicted_test}** will be used - {engine._get_test_reason(group_a_data, group_b_data)}")
+        st.info(f"🔬 **{diagnosis.test_name}** will be used - {diagnosis.reason}")
     
     with col2:
         if not validation['is_balanced']:
             st.warning(f"⚖️ Unbalanced groups ({validation['size_ratio']:.1f}:1)")
         else:
             st.success(f"⚖️ Balanced groups ({validation['size_ratio']:.1f}:1)")
+    
+    return diagnosis
 
 
 def _display_test_results_simplified(result: TestResult, group_a: GroupDefinition, 
@@ -238,20 +397,15 @@ def _display_test_results_simplified(result: TestResult, group_a: GroupDefinitio
     # Technical details in a compact grid
     st.markdown("#### 📊 Technical Details")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Test Used", result.test_name)
-    
-    with col2:
-        st.metric("Test Statistic", f"{result.statistic:.3f}")
-    
-    with col3:
-        p_display = f"{result.p_value:.4f}" if result.p_value >= 0.0001 else "< 0.0001"
-        st.metric("p-value", p_display)
-    
-    with col4:
-        st.metric("Effect Size", f"{result.effect_size:.3f}")
+    p_display = f"{result.p_value:.4f}" if result.p_value >= 0.0001 else "< 0.0001"
+    metrics = [
+        ("Test Used", result.test_name),
+        ("Test Statistic", f"{result.statistic:.3f}"),
+        ("p-value", p_display),
+        ("Effect Size", f"{result.effect_size:.3f}"),
+    ]
+    for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+        col.metric(label, value)
     
     # Simplified explanations as single line
     _show_simple_interpretations(result, alpha)
@@ -260,42 +414,39 @@ def _display_test_results_simplified(result: TestResult, group_a: GroupDefinitio
 def _show_simple_interpretations(result: TestResult, alpha: float) -> None:
     """Show simple one-line interpretations."""
     
-    # P-value interpretation
-    if result.p_value < 0.001:
-        p_interpretation = "Very strong evidence against chance"
-    elif result.p_value < 0.01:
-        p_interpretation = "Strong evidence against chance"
-    elif result.p_value < alpha:
-        p_interpretation = "Moderate evidence against chance"
-    else:
-        p_interpretation = "Little to no evidence against chance"
+    # P-value interpretation (thresholds: 0.001, 0.01, alpha)
+    p_thresholds = np.array([0.001, 0.01, alpha])
+    p_interpretation = _P_MESSAGES[np.searchsorted(p_thresholds, result.p_value, side='right')]
     
     st.caption(f"**p-value:** {p_interpretation} (threshold: {alpha})")
     
-    # Effect size interpretation
-    effect_size_abs = abs(result.effect_size)
-    if effect_size_abs >= 0.8:
-        effect_interpretation = "Large practical difference"
-    elif effect_size_abs >= 0.5:
-        effect_interpretation = "Medium practical difference"
-    elif effect_size_abs >= 0.2:
-        effect_interpretation = "Small practical difference"
-    else:
-        effect_interpretation = "Negligible practical difference"
+    # Effect size interpretation (same |d| bands as the engine)
+    magnitude_code = np.searchsorted(_EFFECT_THRESHOLDS, abs(result.effect_size), side='right')
+    effect_interpretation = f"{_EFFECT_MAGNITUDES[magnitude_code]} practical difference"
     
     st.caption(f"**Effect size:** {effect_interpretation}")
 
 
-def _display_statistical_assumptions(assumptions: dict) -> None:
-    """Display the statistical assumptions and their test results with educational content."""
-    with st.expander("🔍 Statistical Assumptions & Test Selection Details", expanded=False):
+@st.fragment
+def _display_statistical_assumptions(assumptions: dict, mwu_method: Optional[str] = None) -> None:
+    """
+    Display the statistical assumptions and their test results with educational content.
+    
+    The details are only built once the user asks for them, and the checkbox
+    lives in a fragment so toggling it does not rerun the whole analysis page.
+    """
+    if not st.checkbox("Show assumption details", key="assumptions_open"):
+        return
+    
+    with st.expander("🔍 Statistical Assumptions & Test Selection Details", expanded=True):
         st.markdown("""
         **Why do we check assumptions?**
         Different statistical tests make different assumptions about your data. We automatically check these assumptions to pick the best test for your specific data.
         """)
         
-        st.markdown("### 📊 Normality Tests (Shapiro-Wilk)")
-        st.caption("Tests whether each group follows a normal (bell-curve) distribution")
+        st.markdown("### 📊 Normality Tests")
+        st.caption("Tests whether each group follows a normal (bell-curve) distribution "
+                   "(Shapiro-Wilk, or D'Agostino-Pearson for groups above 5,000 values)")
         
         col1, col2 = st.columns(2)
         
@@ -344,6 +495,21 @@ def _display_statistical_assumptions(assumptions: dict) -> None:
         **Why this matters:** Using the wrong test can lead to incorrect conclusions!
         """)
         
+        if mwu_method == 'asymptotic':
+            st.caption("Mann-Whitney p-value uses the tie-corrected normal approximation "
+                       "(both groups have 20+ users), which is fast and accurate at this size")
+        elif mwu_method is not None:
+            st.caption("Mann-Whitney p-value method chosen automatically by SciPy "
+                       "(exact for small groups without ties)")
+        
+        st.toggle(
+            "Use normal approximation for Mann-Whitney U (groups of 20+)",
+            value=True,
+            key='mwu_asymptotic',
+            help="Applies the next time you run the analysis. Turn off to let SciPy pick "
+                 "the p-value method for every group size."
+        )
+        
         st.markdown("### 📚 Learn More")
         with st.expander("What is normality and why does it matter?"):
             st.markdown("""
@@ -377,14 +543,14 @@ def _display_normality_result(group_name: str, assumption: dict) -> None:
         if assumption['is_normal']:
             st.success(f"""
             ✅ **{group_name}: Normal distribution**
-            - Shapiro-Wilk p = {assumption['p_value']:.4f}
+            - {assumption.get('test', 'Shapiro-Wilk')} p = {assumption['p_value']:.4f}
             - Data follows bell-curve pattern
             - T-tests are appropriate
             """)
         else:
             st.warning(f"""
             ⚠️ **{group_name}: Non-normal distribution**
-            - Shapiro-Wilk p = {assumption['p_value']:.4f}
+            - {assumption.get('test', 'Shapiro-Wilk')} p = {assumption['p_value']:.4f}
             - Data doesn't follow bell-curve pattern
             - Non-parametric tests recommended
             """)
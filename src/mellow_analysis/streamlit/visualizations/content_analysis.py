@@ -7,7 +7,105 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-from collections import Counter
+
+# Question difficulty labels and the accuracy edges separating them
+# (bins are closed on the left, so 0.5 is already 'Difficult')
+_DIFFICULTY_LABELS = ['Very Difficult (<50%)', 'Difficult (50-70%)', 'Moderate (70-80%)',
+                      'Easy (80-90%)', 'Very Easy (>90%)']
+_DIFFICULTY_BINS = [-np.inf, 0.5, 0.7, 0.8, 0.9, np.inf]
+
+# Below this many rows DataFrame.nsmallest's overhead doesn't matter
+_PARTITION_MIN_ROWS = 100
+
+
+def _nsmallest(df: pd.DataFrame, n: int, column: str) -> pd.DataFrame:
+    """
+    Rows with the n smallest values of a column, in ascending order.
+    
+    Large frames select on the raw numpy column with argpartition (O(n)) and
+    only sort the n winners; small frames keep DataFrame.nsmallest.
+    """
+    if len(df) < _PARTITION_MIN_ROWS:
+        return df.nsmallest(n, column)
+    values = df[column].to_numpy()
+    idx = np.argpartition(values, n)[:n]
+    return df.iloc[idx[np.argsort(values[idx], kind='stable')]]
+
+
+@st.cache_data(show_spinner=False)
+def _question_stats(data_version: tuple, _data_loader) -> pd.DataFrame:
+    """
+    Aggregate accuracy and difficulty per question text once per data version.
+    
+    The loader argument is underscore-prefixed so Streamlit does not hash it;
+    data_version (file paths + mtimes) is the cache key.
+    """
+    full_df = _data_loader.load_full_dataset()
+    
+    # Calculate question difficulty by CONTENT (not ID) to handle duplication
+    # (named aggregation yields flat columns, no MultiIndex to flatten)
+    question_stats = full_df.groupby('question', sort=False).agg(
+        accuracy=('is_correct', 'mean'),
+        response_count=('is_correct', 'count'),
+        subcategory=('subcategory_name', 'first'),
+        num_question_ids=('id_question', 'nunique')  # Track how many IDs this question has
+    )
+    
+    # Create difficulty categories (binned in one vectorized pass). Bin the
+    # float64 ratios before downcasting: float32(0.7) is just below 0.7, so
+    # a 7/10 question would otherwise fall into the band below its edge
+    question_stats['difficulty_category'] = pd.cut(
+        question_stats['accuracy'], bins=_DIFFICULTY_BINS, labels=_DIFFICULTY_LABELS, right=False
+    )
+    question_stats = question_stats.astype(
+        {'accuracy': np.float32, 'response_count': np.int32, 'num_question_ids': np.int32}
+    )
+    return question_stats.rename_axis('question_text').reset_index()
+
+
+@st.cache_data(show_spinner=False)
+def _category_stats(data_version: tuple, _data_loader) -> pd.DataFrame:
+    """Aggregate, label and sort accuracy per category/subcategory once per data version."""
+    full_df = _data_loader.load_full_dataset()
+    
+    # Calculate category performance
+    category_stats = full_df.groupby(
+        ['category_name', 'subcategory_name'], sort=False, observed=True
+    ).agg(
+        accuracy=('is_correct', 'mean'),
+        total_responses=('is_correct', 'count'),
+        correct_responses=('is_correct', 'sum')
+    )
+    category_stats = category_stats.rename_axis(['category', 'subcategory']).reset_index()
+    
+    # Create combined label
+    category_stats['topic'] = (category_stats['category'].astype(str) + ' → '
+                               + category_stats['subcategory'].astype(str))
+    
+    # Sort by accuracy (worst first)
+    return category_stats.sort_values('accuracy')
+
+
+@st.cache_data(show_spinner=False)
+def _wrong_answer_counts(data_version: tuple, _data_loader) -> tuple:
+    """Count the 15 most common wrong answers once per data version; returns (counts, total wrong)."""
+    responses_df = _data_loader.load_responses()
+    
+    # Get wrong answers
+    wrong_answers = responses_df[responses_df['is_user_answer_correct'] == 'INCORRECTA']
+    
+    # Count wrong answers by categorical code (user_answer is loaded as a
+    # Categorical), keeping the 15 most common in descending order
+    answers = wrong_answers['user_answer']
+    codes = answers.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(answers.cat.categories))
+    top = np.flatnonzero(counts)
+    top = top[np.argsort(-counts[top], kind='stable')[:15]]
+    wrong_df = pd.DataFrame({
+        'answer': answers.cat.categories[top].astype(str),
+        'count': counts[top]
+    })
+    return wrong_df, len(wrong_answers)
 
 
 def render_question_difficulty(data_loader):
@@ -24,11 +122,12 @@ def render_question_difficulty(data_loader):
         ```python
         # Step 1: Group all responses by question CONTENT (not ID)
         # NOTE: Questions are duplicated with different IDs, so we group by actual content
-        question_stats = full_df.groupby('question').agg({
-            'is_correct': ['mean', 'count'],    # Calculate accuracy & sample size
-            'subcategory_name': 'first',       # Get category (same for all responses)  
-            'id_question': 'nunique'           # Count how many IDs this question has
-        })
+        question_stats = full_df.groupby('question', sort=False).agg(
+            accuracy=('is_correct', 'mean'),               # Calculate accuracy
+            response_count=('is_correct', 'count'),        # Sample size
+            subcategory=('subcategory_name', 'first'),     # Get category (same for all responses)
+            num_question_ids=('id_question', 'nunique')    # Count how many IDs this question has
+        )
         
         # Step 2: Filter questions with sufficient responses for reliability
         min_responses = st.slider("Minimum responses per question", 1, 100, 20)
@@ -102,18 +201,8 @@ def render_question_difficulty(data_loader):
         - **New Reality:** With duplication, minimum 20 responses = ~10 per question ID (better reliability)
         """)
     
-    # Load data
-    full_df = data_loader.load_full_dataset()
-    
-    # Calculate question difficulty by CONTENT (not ID) to handle duplication
-    question_stats = full_df.groupby('question').agg({
-        'is_correct': ['mean', 'count'],
-        'subcategory_name': 'first',
-        'id_question': 'nunique'  # Track how many IDs this question has
-    }).reset_index()
-    
-    # Flatten column names
-    question_stats.columns = ['question_text', 'accuracy', 'response_count', 'subcategory', 'num_question_ids']
+    # Load per-question stats (cached per data version across reruns)
+    question_stats = _question_stats(data_loader.get_data_version(), data_loader)
     
     # Filter questions with sufficient responses
     min_responses = st.slider("Minimum responses per question", 1, 100, 20)
@@ -127,23 +216,6 @@ def render_question_difficulty(data_loader):
     - Average responses per question (after combining duplicates): {question_stats['response_count'].mean():.1f}
     """)
     
-    # Create difficulty categories
-    def categorize_difficulty(accuracy):
-        if accuracy < 0.5:
-            return 'Very Difficult (<50%)'
-        elif accuracy < 0.7:
-            return 'Difficult (50-70%)'
-        elif accuracy < 0.8:
-            return 'Moderate (70-80%)'
-        elif accuracy < 0.9:
-            return 'Easy (80-90%)'
-        else:
-            return 'Very Easy (>90%)'
-    
-    # Fix pandas warning by using .loc for assignment
-    filtered_stats = filtered_stats.copy()
-    filtered_stats.loc[:, 'difficulty_category'] = filtered_stats['accuracy'].apply(categorize_difficulty)
-    
     # Create histogram
     fig = px.histogram(
         filtered_stats,
@@ -181,6 +253,7 @@ def render_question_difficulty(data_loader):
     
     # Show difficulty breakdown
     difficulty_counts = filtered_stats['difficulty_category'].value_counts()
+    difficulty_counts = difficulty_counts[difficulty_counts > 0]
     
     col1, col2 = st.columns(2)
     
@@ -193,7 +266,7 @@ def render_question_difficulty(data_loader):
     with col2:
         # Show most difficult questions
         st.subheader("🔴 Most Difficult Questions")
-        difficult_questions = filtered_stats.nsmallest(3, 'accuracy')
+        difficult_questions = _nsmallest(filtered_stats, 3, 'accuracy')
         
         for idx, row in difficult_questions.iterrows():
             st.write(f"**{row['accuracy']:.1%}** - {row['question_text'][:100]}...")
@@ -214,9 +287,11 @@ def render_category_performance(data_loader):
         ```python
         # Group by category and calculate performance metrics
         # NOTE: This analysis is NOT affected by question duplication since we group by category
-        category_stats = full_df.groupby(['category_name', 'subcategory_name']).agg({
-            'is_correct': ['mean', 'count', 'sum']
-        })
+        category_stats = full_df.groupby(['category_name', 'subcategory_name']).agg(
+            accuracy=('is_correct', 'mean'),
+            total_responses=('is_correct', 'count'),
+            correct_responses=('is_correct', 'sum')
+        )
         ```
         
         **Visualization Method:**
@@ -236,22 +311,8 @@ def render_category_performance(data_loader):
         - Balanced performance indicates good curriculum design
         """)
     
-    # Load data
-    full_df = data_loader.load_full_dataset()
-    
-    # Calculate category performance
-    category_stats = full_df.groupby(['category_name', 'subcategory_name']).agg({
-        'is_correct': ['mean', 'count', 'sum']
-    }).reset_index()
-    
-    # Flatten column names
-    category_stats.columns = ['category', 'subcategory', 'accuracy', 'total_responses', 'correct_responses']
-    
-    # Create combined label
-    category_stats['topic'] = category_stats['category'] + ' → ' + category_stats['subcategory']
-    
-    # Sort by accuracy (worst first)
-    category_stats = category_stats.sort_values('accuracy')
+    # Load labelled, worst-first per-topic stats (cached per data version across reruns)
+    category_stats = _category_stats(data_loader.get_data_version(), data_loader)
     
     # Create horizontal bar chart
     fig = px.bar(
@@ -317,7 +378,7 @@ def render_wrong_answers_analysis(data_loader):
         ```python
         # Filter incorrect responses and count frequencies
         wrong_answers = responses_df[responses_df['is_user_answer_correct'] == 'INCORRECTA']
-        wrong_counts = Counter(wrong_answers['user_answer'])
+        wrong_counts = wrong_answers['user_answer'].value_counts().head(15)
         ```
         
         **Visualization Method:**
@@ -338,26 +399,18 @@ def render_wrong_answers_analysis(data_loader):
         - Can guide development of additional learning materials
         """)
     
-    # Load data
-    responses_df = data_loader.load_responses()
-    
-    # Get wrong answers
-    wrong_answers = responses_df[responses_df['is_user_answer_correct'] == 'INCORRECTA']
+    # Load wrong-answer counts (cached per data version across reruns)
+    wrong_df, total_wrong = _wrong_answer_counts(data_loader.get_data_version(), data_loader)
     
-    if len(wrong_answers) == 0:
+    if total_wrong == 0:
         st.info("No incorrect answers found in the dataset.")
         return
     
-    # Count wrong answers
-    wrong_counts = Counter(wrong_answers['user_answer'])
-    
-    # Convert to DataFrame
-    wrong_df = pd.DataFrame(wrong_counts.most_common(15), columns=['answer', 'count'])
-    wrong_df['percentage'] = wrong_df['count'] / len(wrong_answers) * 100
+    wrong_df['percentage'] = wrong_df['count'] / total_wrong * 100
     
     # Truncate long answers for display
-    wrong_df['display_answer'] = wrong_df['answer'].apply(
-        lambda x: x[:50] + '...' if len(x) > 50 else x
+    wrong_df['display_answer'] = wrong_df['answer'].str.slice(0, 50) + np.where(
+        wrong_df['answer'].str.len() > 50, '...', ''
     )
     
     # Create horizontal bar chart
@@ -400,13 +453,12 @@ def render_wrong_answers_analysis(data_loader):
     """)
     
     # Show insights
-    total_wrong = len(wrong_answers)
-    most_common = wrong_df.iloc[0]
+    top_mistake = wrong_df.iloc[0]
     
     st.info(f"""
     **Key Insights:**
     - Total incorrect responses: {total_wrong:,}
-    - Most common mistake: "{most_common['answer']}" ({most_common['count']} times, {most_common['percentage']:.1f}% of all mistakes)
+    - Most common mistake: "{top_mistake['answer']}" ({top_mistake['count']} times, {top_mistake['percentage']:.1f}% of all mistakes)
     - Top 5 mistakes account for {wrong_df.head()['percentage'].sum():.1f}% of all errors
     """)
     
@@ -7,7 +7,485 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 from datetime import datetime
+from typing import Final
+
+# Static explanation tables, built once at import rather than on every rerun
+
+# KPI explanation table
+_KPI_TABLE = pd.DataFrame({
+    'Metric': ['Total Responses', 'Unique Users', 'Overall Accuracy', 'Avg Responses/User'],
+    'Calculation': [
+        'len(responses_df)',
+        'responses_df["id_user_hash"].nunique()',
+        'responses_df["is_correct"].mean()',
+        'total_responses / unique_users'
+    ],
+    'What It Measures': [
+        'Total platform activity volume',
+        'Size of active user base',
+        'Learning effectiveness rate (unaffected by duplication)',
+        'User engagement intensity'
+    ],
+    'Business Significance': [
+        'Scale of platform usage',
+        'Market penetration success',
+        'Educational effectiveness',
+        'User commitment level'
+    ],
+    'Good vs Bad Values': [
+        'Higher = More engagement',
+        'Higher = Broader reach',
+        '70-85% = Optimal learning',
+        '10-30 = Good engagement'
+    ]
+})
+
+# Detailed stats explanation table
+_STATS_TABLE = pd.DataFrame({
+    'Category': ['Content Statistics', 'Platform Activity', 'Quality Metrics'],
+    'Includes': [
+        'Questions, Cases, Categories, Subcategories',
+        'Countries, Date Range, Daily Activity',
+        'Accuracy Rates, Response Reliability'
+    ],
+    'Business Use': [
+        'Content inventory and coverage assessment',
+        'Geographic reach and usage patterns',
+        'Learning effectiveness validation'
+    ],
+    'Key Insights': [
+        'Content variety and depth',
+        'Platform adoption and consistency',
+        'Educational quality and user success'
+    ]
+})
+
+# Decision framework table
+_DECISION_TABLE = pd.DataFrame({
+    'If You See...': ['High responses, low users', 'Low accuracy (<60%)', 'High accuracy (>90%)', 'Declining daily activity'],
+    'It Means...': [
+        'Few power users, not broad adoption',
+        'Content too difficult or unclear',
+        'Content may be too easy',
+        'User engagement dropping'
+    ],
+    'Action Required': [
+        'User acquisition campaign needed',
+        'Content review and improvement',
+        'Add advanced/complex content',
+        'Re-engagement strategy needed'
+    ],
+    'Success Metrics': [
+        'Increase unique user count',
+        'Target 70-85% accuracy range',
+        'Maintain 75-85% sweet spot',
+        'Reverse activity decline trend'
+    ]
+})
+
+# Aggregation explanation table
+_AGG_TABLE = pd.DataFrame({
+    'Column': ['is_correct', 'is_correct', 'is_correct', 'id_user_hash'],
+    'Function': ['mean', 'count', 'sum', 'nunique'],
+    'Result': ['Daily Accuracy %', 'Total Responses', 'Correct Responses', 'Unique Users'],
+    'Formula': [
+        'Sum of correct / Total responses per day',
+        'Number of responses submitted per day',
+        'Count of responses where is_correct = 1',
+        'Count of distinct users active per day'
+    ],
+    'Business Use': [
+        'Track learning effectiveness over time',
+        'Monitor platform usage and engagement',
+        'Calculate absolute success metrics',
+        'Measure user base activity'
+    ]
+})
+
+# Chart explanation table
+_CHART_TABLE = pd.DataFrame({
+    'Element': ['Line Graph', 'Dual Y-Axis', 'Time Series', 'Trend Line', 'Volume Bars'],
+    'What It Shows': [
+        'Daily accuracy rate progression',
+        'Accuracy % (left) + Response count (right)',
+        'Chronological progression over time',
+        'Overall direction of improvement',
+        'Daily platform usage volume'
+    ],
+    'Why Important': [
+        'Shows if users are learning over time',
+        'Reveals relationship between usage and performance',
+        'Identifies patterns and seasonality',
+        'Validates platform effectiveness',
+        'Indicates user engagement levels'
+    ],
+    'Interpretation': [
+        'Upward = Users improving, Flat = No progress',
+        'High volume + high accuracy = Optimal',
+        'Consistent patterns = Predictable behavior',
+        'Positive slope = Effective learning',
+        'Spikes = Marketing campaigns or events'
+    ]
+})
+
+# Static markdown, defined once so render functions only pass constants
+
+# Data structure note shown above the KPI cards
+_OVERVIEW_WARNING_MD: Final[str] = """
+🔍 **Important Data Structure Note:**
+This dataset contains **systematic question duplication** - each question appears with 2 different IDs but identical content. 
+This is intentional (for exam structure) and has been accounted for in our analysis. Question difficulty analysis now groups by content, not ID.
+"""
+
+# Trends explainer: how the daily statistics are computed
+_TRENDS_EXPLAINER_MD: Final[str] = """
+**Step-by-Step Data Processing:**
+```python
+# Step 1: Extract date from timestamp and group by date
+responses_df['date'] = responses_df['exam_created_at'].dt.date
+
+# Step 2: Calculate daily statistics
+daily_stats = responses_df.groupby('date', observed=True).agg({
+    'is_correct': ['mean', 'count', 'sum'],  # Accuracy, volume, correct count
+    'id_user_hash': 'nunique'                # Unique users per day
+})
+```
+
+**What Each Aggregation Calculates:**
+"""
+
+# Trends explainer: patterns worth watching for
+_TRENDS_PATTERNS_MD: Final[str] = """
+**Key Patterns to Look For:**
+- 📈 **Learning Curve:** Gradually increasing accuracy suggests effective teaching
+- 📊 **Volume Correlation:** High usage days with maintained accuracy = good user experience
+- 🔄 **Seasonality:** Regular patterns help predict resource needs
+- ⚠️ **Warning Signs:** Declining accuracy or sudden drops in usage
+"""
+
+# Reading guide for the performance trends chart
+_TRENDS_CHART_GUIDE_MD: Final[str] = """
+### 👁️ **What You're Looking At in This Chart:**
+- **📊 Chart Type:** Line chart with bars (dual-axis visualization)
+- **📈 X-Axis:** Date (chronological time progression)
+- **📊 Left Y-Axis (Blue Line):** Daily accuracy rate (0% to 100%)
+- **📊 Right Y-Axis (Orange Bars):** Number of responses per day
+- **🎯 Blue Line with Dots:** Shows accuracy trend over time
+- **🟧 Orange Bars:** Shows daily platform usage volume
+
+**How to Read It:**
+- **Line going UP** = Users improving over time (learning happening!)
+- **Line going DOWN** = Performance declining (needs attention)
+- **TALL orange bars** = High usage days (busy periods)
+- **Short orange bars** = Low usage days (quiet periods)
+- **Line + bars moving together** = More practice leads to better performance
+- **Flat line** = Stable performance (no improvement or decline)
+"""
+
+# Engagement explainer: how the hourly chart is built
+_ENGAGEMENT_EXPLAINER_MD: Final[str] = """
+**Data Processing:**
+```python
+# Extract hour from timestamp and count responses
+hourly_activity = responses_df['hour'].value_counts(sort=False).sort_index()
+```
+
+**Visualization Method:**
+- **Bar Chart:** Shows distribution of responses across 24 hours
+- **Color Coding:** Different colors for different time periods (morning, afternoon, evening)
+
+**Business Intuition:**
+Understanding when users are most active helps:
+- Optimize server resources and maintenance windows
+- Schedule content releases and notifications
+- Identify user behavior patterns (e.g., studying after work)
+
+**Key Insights:**
+- Peak hours reveal when medical professionals prefer to study
+- Low activity periods are good for system maintenance
+- Patterns might differ by geography or user type
+"""
+
+# Reading guide for the hourly activity chart
+_HOURLY_CHART_GUIDE_MD: Final[str] = """
+### 👁️ **What You're Looking At in This Chart:**
+- **📊 Chart Type:** Bar chart (vertical bars)
+- **📈 X-Axis:** Hour of day (0 = midnight, 12 = noon, 23 = 11 PM)
+- **📊 Y-Axis:** Number of responses during that hour
+- **🎯 Each Bar:** Represents total activity for one hour across all days
+- **🌈 Bar Colors:** Green = Morning, Blue = Afternoon, Purple = Evening, Gray = Night
+- **📏 Bar Height:** Taller bars = More active hours
+
+**How to Read It:**
+- **TALL bars** = Peak usage times (users prefer studying then)
+- **Short bars** = Low activity periods (good for maintenance)
+- **Color patterns** = Shows which time periods are most popular
+- **Multiple peaks** = Different user groups with different schedules
+"""
+
+# Daily trend points beyond which the chart switches to weekly points
+_MAX_TREND_POINTS = 1500
+
+# Largest per-date user bitset (n_dates x n_users bits) built for the daily
+# unique-user counts; bigger date/user spans fall back to groupby nunique
+_USER_BITSET_MAX_BYTES = 64 * 2**20
+
+# Time period label for each hour of the day (0-23)
+_HOUR_PERIOD = np.array(
+    ['Night'] * 6 + ['Morning'] * 6 + ['Afternoon'] * 6 + ['Evening'] * 4 + ['Night'] * 2,
+    dtype=object
+)
+
+
+@st.cache_data(show_spinner=False)
+def _overview_summary(data_version: tuple, _data_loader) -> tuple:
+    """
+    Compute the KPI stats and both dataset summary tables once per data version.
+    
+    The loader argument is underscore-prefixed so Streamlit does not hash it;
+    data_version (file paths + mtimes) is the cache key.
+    
+    Returns:
+        (summary stats dict, KPI card specs, cases summary table, responses summary table)
+    """
+    stats = _data_loader.get_summary_stats()
+    
+    # KPI cards as (label, formatted value, help) so the render just loops over them
+    metric_specs = (
+        ("Total Responses", f"{stats['total_responses']:,}",
+         "Total number of question responses across all users"),
+        ("Unique Users", f"{stats['unique_users']:,}",
+         "Number of distinct users who have taken exams"),
+        ("Overall Accuracy", f"{stats['overall_accuracy']:.1%}",
+         "Percentage of questions answered correctly across all responses"),
+        ("Avg Responses/User", stats['avg_per_user_str'],
+         "Average number of questions answered per user"),
+    )
+    
+    # Both tables reuse the loader's summary counts instead of rescanning the datasets
+    cases_metrics = {
+        "Total Rows": stats['total_case_rows'],
+        "Unique Exams": stats['unique_exams'],
+        "Unique Cases": stats['unique_cases'],
+        "Unique Questions": stats['case_question_ids'],
+        "Categories": stats['categories'],
+        "Sub-Categories": stats['subcategories'],
+    }
+    
+    cases_stats_df = (
+        pd.DataFrame(cases_metrics.items(), columns=["Metric", "Value"])  # type: ignore[arg-type]
+        .sort_values("Metric")
+        .reset_index(drop=True)
+    )
+    
+    responses_metrics = {
+        "Total Responses": stats['total_responses'],
+        "Unique Users": stats['unique_users'],
+        "Countries Represented": stats['countries'],
+        "Unique Questions Answered": stats['unique_questions'],
+        "Overall Accuracy": f"{stats['overall_accuracy']:.1%}",
+        "Date Range": stats['date_range_str'],
+    }
+    
+    responses_stats_df = (
+        pd.DataFrame(responses_metrics.items(), columns=["Metric", "Value"])  # type: ignore[arg-type]
+        .sort_values("Metric")
+        .reset_index(drop=True)
+    )
+    
+    return stats, metric_specs, cases_stats_df, responses_stats_df
+
+
+@st.cache_data(show_spinner=False)
+def _daily_stats(data_version: tuple, _data_loader) -> pd.DataFrame:
+    """Aggregate accuracy, volume and active users per day once per data version."""
+    hot_df = _data_loader.load_hot_responses()
+    
+    date = hot_df['date']
+    
+    # Per-day counts straight from the categorical codes: two bincounts instead
+    # of a general groupby (codes follow the sorted date categories)
+    date_codes = date.cat.codes.to_numpy()
+    has_date = date_codes >= 0
+    date_codes = date_codes[has_date]
+    n_dates = len(date.cat.categories)
+    correct = hot_df['is_correct'].to_numpy()[has_date]
+    total_responses = np.bincount(date_codes, minlength=n_dates)
+    correct_responses = np.bincount(date_codes, weights=correct, minlength=n_dates)
+    
+    # Unique users per day from a per-date bitset of user codes
+    user_codes = hot_df['uid'].to_numpy()[has_date]
+    unique_users = _unique_users_per_date(date_codes, user_codes, n_dates)
+    
+    observed = np.flatnonzero(total_responses)
+    return pd.DataFrame({
+        'date': pd.Categorical.from_codes(observed, dtype=date.dtype),
+        'accuracy': correct_responses[observed] / total_responses[observed],
+        'total_responses': total_responses[observed],
+        'correct_responses': correct_responses[observed].astype(np.int64),
+        'unique_users': unique_users[observed],
+    })
+
+
+def _unique_users_per_date(date_codes: np.ndarray, user_codes: np.ndarray,
+                           n_dates: int) -> np.ndarray:
+    """
+    Distinct user codes per date code (negative codes are missing dates/users and skipped).
+    
+    Sets one bit per (date, user) in a per-date bitset with a single scatter and
+    popcounts each row (no hashing or sorting). When the bitset would exceed
+    _USER_BITSET_MAX_BYTES it falls back to a groupby nunique.
+    """
+    valid = (date_codes >= 0) & (user_codes >= 0)
+    date_codes = date_codes[valid].astype(np.int64)
+    user_codes = user_codes[valid].astype(np.int64)
+    words = (int(user_codes.max(initial=-1)) + 64) >> 6
+    
+    if n_dates * words * 8 > _USER_BITSET_MAX_BYTES:
+        counts = pd.Series(user_codes).groupby(date_codes).nunique()
+        unique_users = np.zeros(n_dates, dtype=np.int64)
+        unique_users[counts.index.to_numpy()] = counts.to_numpy()
+        return unique_users
+    
+    seen = np.zeros(n_dates * words, dtype=np.uint64)
+    np.bitwise_or.at(
+        seen,
+        date_codes * words + (user_codes >> 6),
+        np.left_shift(np.uint64(1), (user_codes & 63).astype(np.uint64)),
+    )
+    return np.bitwise_count(seen).reshape(n_dates, words).sum(axis=1, dtype=np.int64)
+
+
+def _trend_points(daily_stats: pd.DataFrame) -> tuple:
+    """
+    Return the points to plot for the trend chart and their period label.
+    
+    Ranges longer than _MAX_TREND_POINTS days are rolled up into weekly points
+    (accuracy recomputed from the summed counts), so the payload sent to the
+    browser stays bounded however long the history gets.
+    """
+    if len(daily_stats) <= _MAX_TREND_POINTS:
+        return daily_stats, 'Daily'
+    
+    dates = pd.to_datetime(daily_stats['date'].astype(object))
+    weekly = (
+        daily_stats[['total_responses', 'correct_responses']]
+        .set_axis(dates)
+        .resample('W')
+        .sum()
+    )
+    weekly = weekly[weekly['total_responses'] > 0]
+    weekly['accuracy'] = weekly['correct_responses'] / weekly['total_responses']
+    return weekly.rename_axis('date').reset_index(), 'Weekly'
+
+
+@st.cache_data(show_spinner=False)
+def _hourly_activity(data_version: tuple, _data_loader) -> pd.DataFrame:
+    """Count responses per hour of day, labelled by time period, once per data version."""
+    hot_df = _data_loader.load_hot_responses()
+    
+    # Calculate hourly activity (single-column value_counts skips the groupby
+    # key machinery and drops rows without an exam time; only the <= 24
+    # result rows get sorted)
+    counts = hot_df['hour'].value_counts(sort=False)
+    hours = counts.index.to_numpy(dtype=np.int16)
+    order = np.argsort(hours, kind='stable')
+    hourly_activity = pd.DataFrame({
+        'hour': hours[order],
+        'responses': counts.to_numpy()[order],
+    })
+    
+    # Add time period labels (table lookup by hour)
+    hourly_activity['period'] = _HOUR_PERIOD[hours[order].astype(np.intp)]
+    return hourly_activity
+
+
+@st.cache_data(show_spinner=False)
+def _trends_figure(data_version: tuple, _data_loader) -> tuple:
+    """
+    Build the accuracy/volume trend chart once per data version.
+    
+    Returns:
+        (plain figure dict, last-week mean daily accuracy, overall mean daily accuracy)
+    """
+    daily_stats = _daily_stats(data_version, _data_loader)
+    plot_stats, period = _trend_points(daily_stats)
+    
+    # Summary insight values, computed here so reruns only read them
+    accuracy = daily_stats['accuracy'].to_numpy(dtype=np.float64)
+    latest_accuracy = float(accuracy[-7:].mean())  # Last week average
+    overall_accuracy = float(accuracy.mean())
+    
+    # Create subplot with secondary y-axis
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    # Add accuracy trend (WebGL, so long ranges don't bog down the SVG renderer)
+    fig.add_trace(
+        go.Scattergl(
+            x=plot_stats['date'],
+            y=plot_stats['accuracy'],
+            mode='lines+markers',
+            name=f'{period} Accuracy',
+            line=dict(color='#1f77b4', width=3),
+            hovertemplate='<b>Date:</b> %{x}<br><b>Accuracy:</b> %{y:.1%}<extra></extra>'
+        ),
+        secondary_y=False,
+    )
+    
+    # Add volume bars
+    fig.add_trace(
+        go.Bar(
+            x=plot_stats['date'],
+            y=plot_stats['total_responses'],
+            name=f'{period} Responses',
+            opacity=0.7,
+            marker_color='#ff7f0e',
+            hovertemplate='<b>Date:</b> %{x}<br><b>Responses:</b> %{y}<extra></extra>'
+        ),
+        secondary_y=True,
+    )
+    
+    # Update layout
+    fig.update_xaxes(title_text="Date")
+    fig.update_yaxes(title_text="Accuracy Rate", secondary_y=False, tickformat='.0%')
+    fig.update_yaxes(title_text="Number of Responses", secondary_y=True)
+    
+    fig.update_layout(
+        title="Performance and Volume Trends Over Time",
+        hovermode='x unified',
+        height=500
+    )
+    
+    return fig.to_dict(), latest_accuracy, overall_accuracy
+
+
+@st.cache_data(show_spinner=False)
+def _hourly_figure(data_version: tuple, _data_loader) -> dict:
+    """Build the activity-by-hour chart once per data version, as a plain figure dict."""
+    hourly_activity = _hourly_activity(data_version, _data_loader)
+    
+    # Create bar chart
+    fig = px.bar(
+        hourly_activity, 
+        x='hour', 
+        y='responses',
+        color='period',
+        title='User Activity by Hour of Day',
+        labels={'hour': 'Hour of Day', 'responses': 'Number of Responses'},
+        color_discrete_map={
+            'Morning': '#2E8B57',    # Sea Green
+            'Afternoon': '#4682B4',   # Steel Blue  
+            'Evening': '#8A2BE2',     # Blue Violet
+            'Night': '#2F4F4F'        # Dark Slate Gray
+        }
+    )
+    
+    fig.update_layout(height=400)
+    fig.update_xaxes(dtick=2)  # Show every 2 hours
+    
+    return fig.to_dict()
 
 
 def render_overview_metrics(data_loader):
@@ -20,11 +498,7 @@ def render_overview_metrics(data_loader):
     st.header("📊 Overview Metrics")
     
     # Important data structure note
-    st.warning("""
-    🔍 **Important Data Structure Note:**
-    This dataset contains **systematic question duplication** - each question appears with 2 different IDs but identical content. 
-    This is intentional (for exam structure) and has been accounted for in our analysis. Question difficulty analysis now groups by content, not ID.
-    """)
+    st.warning(_OVERVIEW_WARNING_MD)
     
     # How it's built explanation
     with st.expander("🔧 How These KPIs Are Calculated & What They Mean"):
@@ -34,130 +508,29 @@ def render_overview_metrics(data_loader):
         Each metric is calculated directly from the raw data to ensure accuracy:
         """)
         
-        # Create KPI explanation table
-        kpi_data = {
-            'Metric': ['Total Responses', 'Unique Users', 'Overall Accuracy', 'Avg Responses/User'],
-            'Calculation': [
-                'len(responses_df)',
-                'responses_df["id_user_hash"].nunique()',
-                'responses_df["is_correct"].mean()',
-                'total_responses / unique_users'
-            ],
-            'What It Measures': [
-                'Total platform activity volume',
-                'Size of active user base',
-                'Learning effectiveness rate (unaffected by duplication)',
-                'User engagement intensity'
-            ],
-            'Business Significance': [
-                'Scale of platform usage',
-                'Market penetration success',
-                'Educational effectiveness',
-                'User commitment level'
-            ],
-            'Good vs Bad Values': [
-                'Higher = More engagement',
-                'Higher = Broader reach',
-                '70-85% = Optimal learning',
-                '10-30 = Good engagement'
-            ]
-        }
-        
-        kpi_df = pd.DataFrame(kpi_data)
-        st.table(kpi_df)
+        st.table(_KPI_TABLE)
         
         st.markdown("""
         **Detailed Statistics Breakdown:**
         """)
         
-        # Create detailed stats explanation table
-        stats_data = {
-            'Category': ['Content Statistics', 'Platform Activity', 'Quality Metrics'],
-            'Includes': [
-                'Questions, Cases, Categories, Subcategories',
-                'Countries, Date Range, Daily Activity',
-                'Accuracy Rates, Response Reliability'
-            ],
-            'Business Use': [
-                'Content inventory and coverage assessment',
-                'Geographic reach and usage patterns',
-                'Learning effectiveness validation'
-            ],
-            'Key Insights': [
-                'Content variety and depth',
-                'Platform adoption and consistency',
-                'Educational quality and user success'
-            ]
-        }
-        
-        stats_df = pd.DataFrame(stats_data)
-        st.table(stats_df)
+        st.table(_STATS_TABLE)
         
         st.markdown("""
         **Executive Decision Framework:**
         """)
         
-        # Create decision framework table
-        decision_data = {
-            'If You See...': ['High responses, low users', 'Low accuracy (<60%)', 'High accuracy (>90%)', 'Declining daily activity'],
-            'It Means...': [
-                'Few power users, not broad adoption',
-                'Content too difficult or unclear',
-                'Content may be too easy',
-                'User engagement dropping'
-            ],
-            'Action Required': [
-                'User acquisition campaign needed',
-                'Content review and improvement',
-                'Add advanced/complex content',
-                'Re-engagement strategy needed'
-            ],
-            'Success Metrics': [
-                'Increase unique user count',
-                'Target 70-85% accuracy range',
-                'Maintain 75-85% sweet spot',
-                'Reverse activity decline trend'
-            ]
-        }
-        
-        decision_df = pd.DataFrame(decision_data)
-        st.table(decision_df)
+        st.table(_DECISION_TABLE)
         
     
-    # Get summary statistics
-    stats = data_loader.get_summary_stats()
+    # Get summary statistics and dataset tables (cached per data version across reruns)
+    stats, metric_specs, cases_stats_df, responses_stats_df = _overview_summary(
+        data_loader.get_data_version(), data_loader
+    )
     
     # Create metric cards
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            label="Total Responses",
-            value=f"{stats['total_responses']:,}",
-            help="Total number of question responses across all users"
-        )
-    
-    with col2:
-        st.metric(
-            label="Unique Users",
-            value=f"{stats['unique_users']:,}",
-            help="Number of distinct users who have taken exams"
-        )
-    
-    with col3:
-        st.metric(
-            label="Overall Accuracy",
-            value=f"{stats['overall_accuracy']:.1%}",
-            help="Percentage of questions answered correctly across all responses"
-        )
-    
-    with col4:
-        avg_per_user = stats['total_responses'] / stats['unique_users']
-        st.metric(
-            label="Avg Responses/User",
-            value=f"{avg_per_user:.1f}",
-            help="Average number of questions answered per user"
-        )
+    for col, (label, value, help_text) in zip(st.columns(len(metric_specs)), metric_specs):
+        col.metric(label=label, value=value, help=help_text)
     
     # Additional detailed metrics
     st.subheader("📋 Detailed Statistics")
@@ -176,14 +549,12 @@ def render_overview_metrics(data_loader):
         """)
     
     with col2:
-        date_range = stats['date_range']
-        duration = (date_range['end'] - date_range['start']).days
         st.info(f"""
         **Platform Activity:**
         - Countries: {stats['countries']:,}
-        - Date Range: {date_range['start'].strftime('%Y-%m-%d')} to {date_range['end'].strftime('%Y-%m-%d')}
-        - Duration: {duration} days
-        - Avg Responses/Day: {stats['total_responses'] / max(duration, 1):.1f}
+        - Date Range: {stats['date_range_str']}
+        - Duration: {stats['duration_days']} days
+        - Avg Responses/Day: {stats['avg_per_day_str']}
         """)
 
     # ------------------------------------------------------------------
@@ -192,50 +563,16 @@ def render_overview_metrics(data_loader):
 
     st.subheader("🗂️ Dataset Descriptive Statistics")
 
-    # Load full datasets (cached inside the DataLoader)
-    cases_df = data_loader.load_cases()
-    responses_df = data_loader.load_responses()
-
     # --------------------------------------------------
     # 1️⃣  Cases / Questions Dataset
     # --------------------------------------------------
     with st.expander("📚 Cases & Questions Dataset Summary", expanded=False):
-        cases_metrics = {
-            "Total Rows": len(cases_df),
-            "Unique Exams": cases_df["id_exam"].nunique(),
-            "Unique Cases": cases_df["id_case"].nunique(),
-            "Unique Questions": cases_df["id_question"].nunique(),
-            "Categories": cases_df["category_name"].nunique(),
-            "Sub-Categories": cases_df["subcategory_name"].nunique(),
-        }
-
-        cases_stats_df = (
-            pd.DataFrame(cases_metrics.items(), columns=["Metric", "Value"])  # type: ignore[arg-type]
-            .sort_values("Metric")
-            .reset_index(drop=True)
-        )
-
         st.table(cases_stats_df)
 
     # --------------------------------------------------
     # 2️⃣  User Responses Dataset
     # --------------------------------------------------
     with st.expander("🧑‍⚕️ User Responses Dataset Summary", expanded=False):
-        responses_metrics = {
-            "Total Responses": len(responses_df),
-            "Unique Users": responses_df["id_user_hash"].nunique(),
-            "Countries Represented": responses_df["country_user_made_the_exam"].nunique(),
-            "Unique Questions Answered": responses_df["id_question"].nunique(),
-            "Overall Accuracy": f"{responses_df['is_correct'].mean():.1%}",
-            "Date Range": f"{responses_df['exam_created_at'].min().date()} to {responses_df['exam_created_at'].max().date()}",
-        }
-
-        responses_stats_df = (
-            pd.DataFrame(responses_metrics.items(), columns=["Metric", "Value"])  # type: ignore[arg-type]
-            .sort_values("Metric")
-            .reset_index(drop=True)
-        )
-
         st.table(responses_stats_df)
 
 
@@ -248,166 +585,30 @@ def render_performance_trends(data_loader):
     
     # How it's built explanation
     with st.expander("🔧 How This Chart Is Built & Data Processing Details"):
-        st.markdown("""
-        **Step-by-Step Data Processing:**
-        ```python
-        # Step 1: Extract date from timestamp and group by date
-        responses_df['date'] = responses_df['exam_created_at'].dt.date
+        st.markdown(_TRENDS_EXPLAINER_MD)
         
-        # Step 2: Calculate daily statistics
-        daily_stats = responses_df.groupby('date').agg({
-            'is_correct': ['mean', 'count', 'sum'],  # Accuracy, volume, correct count
-            'id_user_hash': 'nunique'                # Unique users per day
-        })
-        ```
-        
-        **What Each Aggregation Calculates:**
-        """)
-        
-        # Create aggregation explanation table
-        agg_data = {
-            'Column': ['is_correct', 'is_correct', 'is_correct', 'id_user_hash'],
-            'Function': ['mean', 'count', 'sum', 'nunique'],
-            'Result': ['Daily Accuracy %', 'Total Responses', 'Correct Responses', 'Unique Users'],
-            'Formula': [
-                'Sum of correct / Total responses per day',
-                'Number of responses submitted per day',
-                'Count of responses where is_correct = 1',
-                'Count of distinct users active per day'
-            ],
-            'Business Use': [
-                'Track learning effectiveness over time',
-                'Monitor platform usage and engagement',
-                'Calculate absolute success metrics',
-                'Measure user base activity'
-            ]
-        }
-        
-        agg_df = pd.DataFrame(agg_data)
-        st.table(agg_df)
+        st.table(_AGG_TABLE)
         
         st.markdown("""
         **Chart Construction & Interpretation:**
         """)
         
-        # Create chart explanation table
-        chart_data = {
-            'Element': ['Line Graph', 'Dual Y-Axis', 'Time Series', 'Trend Line', 'Volume Bars'],
-            'What It Shows': [
-                'Daily accuracy rate progression',
-                'Accuracy % (left) + Response count (right)',
-                'Chronological progression over time',
-                'Overall direction of improvement',
-                'Daily platform usage volume'
-            ],
-            'Why Important': [
-                'Shows if users are learning over time',
-                'Reveals relationship between usage and performance',
-                'Identifies patterns and seasonality',
-                'Validates platform effectiveness',
-                'Indicates user engagement levels'
-            ],
-            'Interpretation': [
-                'Upward = Users improving, Flat = No progress',
-                'High volume + high accuracy = Optimal',
-                'Consistent patterns = Predictable behavior',
-                'Positive slope = Effective learning',
-                'Spikes = Marketing campaigns or events'
-            ]
-        }
-        
-        chart_df = pd.DataFrame(chart_data)
-        st.table(chart_df)
+        st.table(_CHART_TABLE)
         
-        st.markdown("""
-        **Key Patterns to Look For:**
-        - 📈 **Learning Curve:** Gradually increasing accuracy suggests effective teaching
-        - 📊 **Volume Correlation:** High usage days with maintained accuracy = good user experience
-        - 🔄 **Seasonality:** Regular patterns help predict resource needs
-        - ⚠️ **Warning Signs:** Declining accuracy or sudden drops in usage
-        """)
+        st.markdown(_TRENDS_PATTERNS_MD)
         
     
-    # Load and process data
-    responses_df = data_loader.load_responses()
-    
-    # Calculate daily statistics
-    daily_stats = responses_df.groupby('date').agg({
-        'is_correct': ['mean', 'count', 'sum'],
-        'id_user_hash': 'nunique'
-    }).reset_index()
-    
-    # Flatten column names
-    daily_stats.columns = ['date', 'accuracy', 'total_responses', 'correct_responses', 'unique_users']
-    
-    # Sort by date
-    daily_stats = daily_stats.sort_values('date')
-    
-    # Create subplot with secondary y-axis
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    
-    # Add accuracy trend
-    fig.add_trace(
-        go.Scatter(
-            x=daily_stats['date'],
-            y=daily_stats['accuracy'],
-            mode='lines+markers',
-            name='Daily Accuracy',
-            line=dict(color='#1f77b4', width=3),
-            hovertemplate='<b>Date:</b> %{x}<br><b>Accuracy:</b> %{y:.1%}<extra></extra>'
-        ),
-        secondary_y=False,
-    )
-    
-    # Add volume bars
-    fig.add_trace(
-        go.Bar(
-            x=daily_stats['date'],
-            y=daily_stats['total_responses'],
-            name='Daily Responses',
-            opacity=0.7,
-            marker_color='#ff7f0e',
-            hovertemplate='<b>Date:</b> %{x}<br><b>Responses:</b> %{y}<extra></extra>'
-        ),
-        secondary_y=True,
-    )
-    
-    # Update layout
-    fig.update_xaxes(title_text="Date")
-    fig.update_yaxes(title_text="Accuracy Rate", secondary_y=False, tickformat='.0%')
-    fig.update_yaxes(title_text="Number of Responses", secondary_y=True)
-    
-    fig.update_layout(
-        title="Performance and Volume Trends Over Time",
-        hovermode='x unified',
-        height=500
+    # Chart and summary insight are built once per data version; reruns only
+    # send the cached spec
+    figure, latest_accuracy, overall_accuracy = _trends_figure(
+        data_loader.get_data_version(), data_loader
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(figure, use_container_width=True)
     
     # Visual interpretation guide
-    st.markdown("""
-    ### 👁️ **What You're Looking At in This Chart:**
-    - **📊 Chart Type:** Line chart with bars (dual-axis visualization)
-    - **📈 X-Axis:** Date (chronological time progression)
-    - **📊 Left Y-Axis (Blue Line):** Daily accuracy rate (0% to 100%)
-    - **📊 Right Y-Axis (Orange Bars):** Number of responses per day
-    - **🎯 Blue Line with Dots:** Shows accuracy trend over time
-    - **🟧 Orange Bars:** Shows daily platform usage volume
-    
-    **How to Read It:**
-    - **Line going UP** = Users improving over time (learning happening!)
-    - **Line going DOWN** = Performance declining (needs attention)
-    - **TALL orange bars** = High usage days (busy periods)
-    - **Short orange bars** = Low usage days (quiet periods)
-    - **Line + bars moving together** = More practice leads to better performance
-    - **Flat line** = Stable performance (no improvement or decline)
-    """)
+    st.markdown(_TRENDS_CHART_GUIDE_MD)
     
     # Show summary insights
-    latest_accuracy = daily_stats['accuracy'].iloc[-7:].mean()  # Last week average
-    overall_accuracy = daily_stats['accuracy'].mean()
-    
     if latest_accuracy > overall_accuracy:
         st.success(f"📈 Recent performance is above average! Last week: {latest_accuracy:.1%} vs Overall: {overall_accuracy:.1%}")
     else:
@@ -423,85 +624,17 @@ def render_user_engagement(data_loader):
     
     # How it's built explanation
     with st.expander("🔧 How This Chart Is Built"):
-        st.markdown("""
-        **Data Processing:**
-        ```python
-        # Extract hour from timestamp and count responses
-        hourly_activity = responses_df.groupby('hour').size()
-        ```
-        
-        **Visualization Method:**
-        - **Bar Chart:** Shows distribution of responses across 24 hours
-        - **Color Coding:** Different colors for different time periods (morning, afternoon, evening)
-        
-        **Business Intuition:**
-        Understanding when users are most active helps:
-        - Optimize server resources and maintenance windows
-        - Schedule content releases and notifications
-        - Identify user behavior patterns (e.g., studying after work)
-        
-        **Key Insights:**
-        - Peak hours reveal when medical professionals prefer to study
-        - Low activity periods are good for system maintenance
-        - Patterns might differ by geography or user type
-        """)
-    
-    responses_df = data_loader.load_responses()
-    
-    # Calculate hourly activity
-    hourly_activity = responses_df.groupby('hour').size().reset_index()
-    hourly_activity.columns = ['hour', 'responses']
-    
-    # Add time period labels
-    def get_period(hour):
-        if 6 <= hour < 12:
-            return 'Morning'
-        elif 12 <= hour < 18:
-            return 'Afternoon'
-        elif 18 <= hour < 22:
-            return 'Evening'
-        else:
-            return 'Night'
-    
-    hourly_activity['period'] = hourly_activity['hour'].apply(get_period)
-    
-    # Create bar chart
-    fig = px.bar(
-        hourly_activity, 
-        x='hour', 
-        y='responses',
-        color='period',
-        title='User Activity by Hour of Day',
-        labels={'hour': 'Hour of Day', 'responses': 'Number of Responses'},
-        color_discrete_map={
-            'Morning': '#2E8B57',    # Sea Green
-            'Afternoon': '#4682B4',   # Steel Blue  
-            'Evening': '#8A2BE2',     # Blue Violet
-            'Night': '#2F4F4F'        # Dark Slate Gray
-        }
-    )
+        st.markdown(_ENGAGEMENT_EXPLAINER_MD)
     
-    fig.update_layout(height=400)
-    fig.update_xaxes(dtick=2)  # Show every 2 hours
+    # Load hourly activity with period labels (cached per data version across reruns)
+    data_version = data_loader.get_data_version()
+    hourly_activity = _hourly_activity(data_version, data_loader)
     
-    st.plotly_chart(fig, use_container_width=True)
+    # Chart is built once per data version; reruns only send the cached spec
+    st.plotly_chart(_hourly_figure(data_version, data_loader), use_container_width=True)
     
     # Visual interpretation guide
-    st.markdown("""
-    ### 👁️ **What You're Looking At in This Chart:**
-    - **📊 Chart Type:** Bar chart (vertical bars)
-    - **📈 X-Axis:** Hour of day (0 = midnight, 12 = noon, 23 = 11 PM)
-    - **📊 Y-Axis:** Number of responses during that hour
-    - **🎯 Each Bar:** Represents total activity for one hour across all days
-    - **🌈 Bar Colors:** Green = Morning, Blue = Afternoon, Purple = Evening, Gray = Night
-    - **📏 Bar Height:** Taller bars = More active hours
-    
-    **How to Read It:**
-    - **TALL bars** = Peak usage times (users prefer studying then)
-    - **Short bars** = Low activity periods (good for maintenance)
-    - **Color patterns** = Shows which time periods are most popular
-    - **Multiple peaks** = Different user groups with different schedules
-    """)
+    st.markdown(_HOURLY_CHART_GUIDE_MD)
     
     # Show peak hours
     peak_hour = hourly_activity.loc[hourly_activity['responses'].idxmax(), 'hour']
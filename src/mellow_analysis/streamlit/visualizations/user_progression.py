@@ -5,12 +5,263 @@ Provides detailed learning progression analysis with distribution bands,
 showing how users improve over time with configurable metrics and insights.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Final
+
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+# Chart elements explanation table, built once at import rather than on every rerun
+_ELEMENTS_TABLE = pd.DataFrame({
+    'Element': [
+        'Blue Shaded Area',
+        'Dark Blue Line', 
+        'Individual Gray Lines',
+        'X-Axis',
+        'Y-Axis'
+    ],
+    'What It Represents': [
+        '25th to 75th percentile range - where most users perform',
+        'Average cumulative accuracy across all users',
+        'Individual user learning curves (optional)',
+        'Attempt number (1st question, 2nd question, etc.)',
+        'Cumulative accuracy rate (lifetime average so far)'
+    ],
+    'How to Interpret': [
+        'Wider band = more variation between users',
+        'Upward trend = users are learning over time',
+        'Each line shows one person\'s learning journey',
+        'Shows progression from first attempt onwards',
+        'Higher = better overall performance'
+    ]
+})
+
+# Static markdown, defined once so the render function only passes constants
+
+# Explainer: how the progression data is processed
+_PROCESSING_STEPS_MD: Final[str] = """
+**Simple Data Processing Steps:**
+```python
+# Step 1: Sort by time to track progression
+responses_df = responses_df.sort_values(['id_user_hash', 'exam_created_at'])
+
+# Step 2: Filter users with enough attempts for meaningful analysis
+user_attempt_counts = responses_df.groupby('id_user_hash', observed=True).size()
+qualified_users = user_attempt_counts[user_attempt_counts >= min_attempts]
+
+# Step 3: Calculate cumulative accuracy for each user (running mean per user)
+user_groups = responses_df.groupby('id_user_hash', observed=True, sort=False)['is_correct']
+attempt_number = user_groups.cumcount() + 1
+cumulative_accuracy = user_groups.cumsum() / attempt_number
+
+# Step 4: Aggregate across all users to show the distribution
+by_attempt = data.groupby('attempt_number')['cumulative_accuracy']
+average = by_attempt.mean()                                # Average performance
+quartiles = by_attempt.quantile([0.25, 0.75]).unstack()    # 25th/75th percentiles
+```
+
+**What The Chart Shows:**
+"""
+
+# Explainer: insights and business applications
+_KEY_INSIGHTS_MD: Final[str] = """
+**Key Insights to Look For:**
+- **📈 Rising Average Line:** Users are learning and improving over time
+- **📊 Narrowing Blue Band:** Users becoming more consistent as they progress  
+- **📈 Widening Blue Band:** Increasing performance gaps between users
+- **📊 Flat Average Line:** No clear learning happening on average
+- **📉 Declining Trend:** Systematic performance issues (fatigue, content difficulty)
+
+**Business Applications:**
+- **Content Effectiveness:** Rising trends indicate good educational design
+- **User Segmentation:** Wide bands suggest need for personalized approaches
+- **Intervention Timing:** Identify when users typically struggle or succeed
+"""
+
+# Reading guide for the progression chart
+_CHART_GUIDE_MD: Final[str] = """
+### 👁️ **What You're Looking At in This Chart:**
+- **📊 Chart Type:** Multi-line progression chart with distribution bands
+- **📈 X-Axis:** Attempt number (1st question, 2nd question, etc.)
+- **📊 Y-Axis:** Cumulative accuracy rate (lifetime average to that point)
+- **🎯 Blue Shaded Area:** Range where 50% of users perform (25th-75th percentile)
+- **📏 Dark Blue Line:** Average performance across all users
+- **📍 Gray Dotted Lines:** Individual user learning curves (if enabled)
+
+**How to Read It:**
+- **Upward trending blue line** = Users are learning over time
+- **Wider blue band** = More variation between high/low performers
+- **Narrower blue band** = Users becoming more consistent
+- **Higher position** = Better overall performance
+- **Steeper slopes** = Faster learning rate
+"""
+
+# Attempt ranges longer than this are grouped into this many attempt bins
+_MAX_ATTEMPT_POINTS = 100
+
+# Points backed by fewer users than this (on average per attempt) are not shown
+_MIN_USERS_PER_POINT = 5
+
+# Charts with more points than this use nearest-point hover instead of a unified tooltip
+_UNIFIED_HOVER_MAX_POINTS = 2000
+
+# Inputs at least this long are swept in parallel chunks split at user boundaries
+_PARALLEL_MIN_ROWS = 1_000_000
+
+# Workers for the chunked sweep; NumPy releases the GIL in these array kernels
+_PROGRESSION_WORKERS = min(4, os.cpu_count() or 1)
+_PROGRESSION_POOL = ThreadPoolExecutor(
+    max_workers=_PROGRESSION_WORKERS, thread_name_prefix='progression'
+)
+
+
+def _running_accuracy(is_correct: np.ndarray, group_codes: np.ndarray) -> tuple:
+    """
+    Attempt number and cumulative accuracy within each contiguous group.
+    
+    Rows must be sorted so each group's rows are adjacent (here: by user, then
+    time). Groups are independent, so long inputs are cut at group starts into
+    one chunk per worker and swept concurrently.
+    
+    Returns:
+        (attempt numbers starting at 1, running mean of is_correct)
+    """
+    n = len(is_correct)
+    if n == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+    
+    starts = np.flatnonzero(np.r_[True, group_codes[1:] != group_codes[:-1]])
+    if n < _PARALLEL_MIN_ROWS or _PROGRESSION_WORKERS < 2:
+        return _sweep_groups(is_correct, starts)
+    
+    # Chunk bounds: the first group start at or after each even split point
+    split_points = np.linspace(0, n, _PROGRESSION_WORKERS + 1)[1:-1]
+    cuts = np.searchsorted(starts, split_points)
+    bounds = np.unique(np.r_[0, starts[cuts[cuts < len(starts)]], n])
+    first_group = np.searchsorted(starts, bounds)
+    chunks = _PROGRESSION_POOL.map(
+        lambda i: _sweep_groups(
+            is_correct[bounds[i]:bounds[i + 1]],
+            starts[first_group[i]:first_group[i + 1]] - bounds[i]
+        ),
+        range(len(bounds) - 1)
+    )
+    attempt_parts, accuracy_parts = zip(*chunks)
+    return np.concatenate(attempt_parts), np.concatenate(accuracy_parts)
+
+
+def _sweep_groups(is_correct: np.ndarray, starts: np.ndarray) -> tuple:
+    """
+    Segmented running mean over rows whose groups begin at starts.
+    
+    One global cumulative sum is rebased in place at every group start, and
+    the attempt counter is built the same way, so the whole sweep is a few
+    in-place array passes with no per-group dispatch.
+    """
+    n = len(is_correct)
+    lengths = np.diff(np.r_[starts, n])
+    
+    # Attempt numbers and running counts are small, so int32 halves the memory
+    # traffic (positions only need int64 past 2**31 rows)
+    work_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+    
+    running_correct = np.cumsum(is_correct, dtype=work_dtype)
+    running_correct -= np.repeat(running_correct[starts] - is_correct[starts], lengths)
+    attempt_number = np.arange(1, n + 1, dtype=work_dtype)
+    attempt_number -= np.repeat(starts.astype(work_dtype), lengths)
+    
+    return attempt_number, running_correct / attempt_number
+
+
+def _plotted_points(fig: go.Figure) -> int:
+    """Total number of x values across the figure's traces."""
+    return sum(len(trace.x) for trace in fig.data if trace.x is not None)
+
+
+@st.cache_data(show_spinner=False)
+def _compute_progression(data_version: tuple, _data_loader, min_attempts: int,
+                         max_users: int) -> tuple:
+    """
+    Compute cumulative accuracy per attempt and its distribution across users.
+    
+    Cached per data version and slider values; the loader argument is
+    underscore-prefixed so Streamlit does not hash it.
+    
+    Returns:
+        (analyzed user ids, per-attempt progression rows, distribution stats by
+        attempt number, headline metrics dict); the user list is empty when
+        nobody qualifies
+    """
+    # Only the rows of the max_users most active qualified users, sorted by user and time
+    filtered_df = _data_loader.load_responses_for_progression(min_attempts, max_users)
+    analyzed_users = filtered_df['id_user_hash'].unique().tolist()
+    
+    # Calculate progression for every user in one pass over the sorted rows
+    attempt_number, cumulative_accuracy = _running_accuracy(
+        filtered_df['is_correct'].to_numpy(dtype=np.int8),
+        filtered_df['id_user_hash'].cat.codes.to_numpy()
+    )
+    
+    all_progression = pd.DataFrame({
+        'id_user_hash': filtered_df['id_user_hash'].array,
+        'attempt_number': attempt_number,
+        'cumulative_accuracy': cumulative_accuracy
+    })
+    
+    # Calculate distribution statistics by attempt number, binning long ranges
+    # (each bin is labelled by its first attempt)
+    attempt_key = attempt_number
+    bin_widths = None
+    if len(attempt_number) and attempt_number.max() > _MAX_ATTEMPT_POINTS:
+        edges = np.unique(
+            np.linspace(1, attempt_number.max() + 1, _MAX_ATTEMPT_POINTS + 1).astype(np.int64)
+        )
+        attempt_key = edges[np.searchsorted(edges, attempt_number, side='right') - 1]
+        bin_widths = pd.Series(np.diff(edges), index=edges[:-1])
+    
+    # Key as int64: Plotly packs int64 axes into the narrowest integer type
+    # when serializing, but sends int32 as-is
+    attempt_groups = all_progression['cumulative_accuracy'].groupby(
+        pd.Series(attempt_key.astype(np.int64, copy=False), name='attempt_number')
+    )
+    quartiles = attempt_groups.quantile([0.25, 0.75]).unstack()
+    quartiles.columns = ['q25', 'q75']
+    distribution_stats = attempt_groups.agg(average='mean', count='count').join(quartiles)
+    if bin_widths is not None:
+        # Rows per bin -> average users per attempt within the bin
+        distribution_stats['count'] = distribution_stats['count'] / bin_widths
+    
+    # Drop thinly supported points (typically the long tail of a few power users)
+    distribution_stats = (
+        distribution_stats[distribution_stats['count'] >= _MIN_USERS_PER_POINT]
+        [['average', 'q25', 'q75', 'count']]
+        .reset_index()
+    )
+    
+    # Headline metrics from the first and last points, read once here so
+    # reruns only format them
+    summary = {
+        'initial_accuracy': 0.0, 'final_accuracy': 0.0, 'max_attempts': 0,
+        'avg_users_per_attempt': 0.0, 'consistency_change': 0.0
+    }
+    if len(distribution_stats) > 0:
+        ends = distribution_stats.iloc[[0, -1]]
+        band_widths = (ends['q75'] - ends['q25']).to_numpy()
+        summary = {
+            'initial_accuracy': float(ends['average'].iat[0]),
+            'final_accuracy': float(ends['average'].iat[1]),
+            # Longest run analyzed, not the last plotted (binned, filtered) point
+            'max_attempts': int(attempt_number.max()),
+            'avg_users_per_attempt': float(distribution_stats['count'].mean()),
+            'consistency_change': float(band_widths[1] - band_widths[0])
+        }
+    
+    return analyzed_users, all_progression, distribution_stats, summary
+
 
 def render_user_progression_analysis(data_loader):
     """
@@ -23,75 +274,12 @@ def render_user_progression_analysis(data_loader):
     
     # How it's built explanation - simplified and clear
     with st.expander("🔧 How This Chart Works & What It Shows"):
-        st.markdown("""
-        **Simple Data Processing Steps:**
-        ```python
-        # Step 1: Sort by time to track progression
-        responses_df = responses_df.sort_values(['id_user_hash', 'exam_created_at'])
-        
-        # Step 2: Filter users with enough attempts for meaningful analysis
-        user_attempt_counts = responses_df.groupby('id_user_hash').size()
-        qualified_users = user_attempt_counts[user_attempt_counts >= min_attempts]
-        
-        # Step 3: Calculate cumulative accuracy for each user
-        user_data['cumulative_accuracy'] = user_data['is_correct'].expanding().mean()
-        
-        # Step 4: Aggregate across all users to show the distribution
-        stats_by_attempt = data.groupby('attempt_number')['cumulative_accuracy'].agg([
-            'mean',                    # Average performance
-            lambda x: x.quantile(0.25), # 25th percentile (bottom quartile)
-            lambda x: x.quantile(0.75)  # 75th percentile (top quartile)
-        ])
-        ```
-        
-        **What The Chart Shows:**
-        """)
+        st.markdown(_PROCESSING_STEPS_MD)
         
         # Clear explanation table
-        chart_elements = {
-            'Element': [
-                'Blue Shaded Area',
-                'Dark Blue Line', 
-                'Individual Gray Lines',
-                'X-Axis',
-                'Y-Axis'
-            ],
-            'What It Represents': [
-                '25th to 75th percentile range - where most users perform',
-                'Average cumulative accuracy across all users',
-                'Individual user learning curves (optional)',
-                'Attempt number (1st question, 2nd question, etc.)',
-                'Cumulative accuracy rate (lifetime average so far)'
-            ],
-            'How to Interpret': [
-                'Wider band = more variation between users',
-                'Upward trend = users are learning over time',
-                'Each line shows one person\'s learning journey',
-                'Shows progression from first attempt onwards',
-                'Higher = better overall performance'
-            ]
-        }
-        
-        elements_df = pd.DataFrame(chart_elements)
-        st.table(elements_df)
-        
-        st.markdown("""
-        **Key Insights to Look For:**
-        - **📈 Rising Average Line:** Users are learning and improving over time
-        - **📊 Narrowing Blue Band:** Users becoming more consistent as they progress  
-        - **📈 Widening Blue Band:** Increasing performance gaps between users
-        - **📊 Flat Average Line:** No clear learning happening on average
-        - **📉 Declining Trend:** Systematic performance issues (fatigue, content difficulty)
+        st.table(_ELEMENTS_TABLE)
         
-        **Business Applications:**
-        - **Content Effectiveness:** Rising trends indicate good educational design
-        - **User Segmentation:** Wide bands suggest need for personalized approaches
-        - **Intervention Timing:** Identify when users typically struggle or succeed
-        """)
-    
-    # Load and prepare data
-    responses_df = data_loader.load_responses()
-    responses_df = responses_df.sort_values(['id_user_hash', 'exam_created_at'])
+        st.markdown(_KEY_INSIGHTS_MD)
     
     # Settings
     col1, col2, col3 = st.columns(3)
@@ -108,63 +296,28 @@ def render_user_progression_analysis(data_loader):
         show_individual_lines = st.checkbox("Show individual user lines", value=False,
                                           help="Toggle to see individual learning curves")
     
-    # Find qualified users
-    user_attempt_counts = responses_df.groupby('id_user_hash').size()
-    qualified_users = user_attempt_counts[user_attempt_counts >= min_attempts].index
+    # Progression and distribution stats (cached per data version and slider values,
+    # so toggling individual lines re-plots without recomputing)
+    analyzed_users, all_progression, distribution_stats, summary = _compute_progression(
+        data_loader.get_data_version(), data_loader, min_attempts, max_users_to_analyze
+    )
     
-    if len(qualified_users) == 0:
+    if len(analyzed_users) == 0:
         st.warning(f"No users found with {min_attempts}+ attempts. Try lowering the minimum.")
         return
     
-    # Limit to top users for performance
-    analyzed_users = qualified_users[:max_users_to_analyze]
-    filtered_df = responses_df[responses_df['id_user_hash'].isin(analyzed_users)]
-    
     st.info(f"Analyzing {len(analyzed_users)} users with {min_attempts}+ attempts each")
     
-    # Calculate progression for each user
-    progression_data = []
-    
-    for user_id in analyzed_users:
-        user_data = filtered_df[filtered_df['id_user_hash'] == user_id].copy()
-        user_data = user_data.sort_values('exam_created_at')
-        
-        # Calculate cumulative accuracy
-        user_data['cumulative_accuracy'] = user_data['is_correct'].expanding().mean()
-        user_data['attempt_number'] = range(1, len(user_data) + 1)
-        
-        progression_data.append(user_data[['id_user_hash', 'attempt_number', 'cumulative_accuracy']])
-    
-    if not progression_data:
+    if all_progression.empty:
         st.error("No valid progression data found.")
         return
     
-    # Combine all user data
-    all_progression = pd.concat(progression_data, ignore_index=True)
-    
-    # Calculate distribution statistics by attempt number
-    distribution_stats = (
-        all_progression
-        .groupby('attempt_number')['cumulative_accuracy']
-        .agg([
-            'mean',
-            lambda x: x.quantile(0.25),
-            lambda x: x.quantile(0.75),
-            'count'
-        ])
-        .rename(columns={
-            'mean': 'average',
-            '<lambda_0>': 'q25',
-            '<lambda_1>': 'q75'
-        })
-        .reset_index()
-    )
-    
-    # Create the clean visualization
+    # Create the clean visualization (WebGL traces, so long attempt ranges and
+    # individual lines don't build heavy SVG)
     fig = go.Figure()
     
     # Add the distribution band (25th-75th percentile)
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=distribution_stats['attempt_number'],
         y=distribution_stats['q75'],
         line=dict(width=0),
@@ -173,7 +326,7 @@ def render_user_progression_analysis(data_loader):
         name='75th percentile'
     ))
     
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=distribution_stats['attempt_number'],
         y=distribution_stats['q25'],
         line=dict(width=0),
@@ -187,7 +340,7 @@ def render_user_progression_analysis(data_loader):
     ))
     
     # Add the average trend line
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=distribution_stats['attempt_number'],
         y=distribution_stats['average'],
         mode='lines+markers',
@@ -201,21 +354,31 @@ def render_user_progression_analysis(data_loader):
     
     # Optionally add individual user lines
     if show_individual_lines:
-        for user_id in analyzed_users[:min(20, len(analyzed_users))]:  # Limit to 20 for visibility
-            user_subset = all_progression[all_progression['id_user_hash'] == user_id]
-            if len(user_subset) > 0:
-                fig.add_trace(go.Scatter(
-                    x=user_subset['attempt_number'],
-                    y=user_subset['cumulative_accuracy'],
-                    mode='lines',
-                    line=dict(color='gray', width=1, dash='dot'),
-                    opacity=0.4,
-                    showlegend=False,
-                    hovertemplate='<b>User: %{text}</b><br>' +
-                                 'Attempt %{x}<br>' +
-                                 'Accuracy: %{y:.1%}<extra></extra>',
-                    text=[user_id[:8] + '...' for _ in range(len(user_subset))]
-                ))
+        # All user curves as one WebGL trace, with a None gap between users
+        # instead of one trace per user. Rows are grouped by user code, so the
+        # first 20 users (limit for visibility) are a prefix located from the
+        # code changes, and labels come from the categories, not per-row strings
+        user_hash = all_progression['id_user_hash']
+        user_codes = user_hash.cat.codes.to_numpy()
+        user_starts = np.flatnonzero(np.r_[True, user_codes[1:] != user_codes[:-1]])
+        gaps = user_starts[1:20]
+        n_rows = user_starts[20] if len(user_starts) > 20 else len(user_codes)
+        user_lines = all_progression.iloc[:n_rows]
+        if n_rows > 0:
+            short_ids = (user_hash.cat.categories.str.slice(0, 8) + '...').to_numpy(dtype=object)
+            labels = short_ids[user_codes[:n_rows]]
+            fig.add_trace(go.Scattergl(
+                x=np.insert(user_lines['attempt_number'].to_numpy(dtype=object), gaps, None),
+                y=np.insert(user_lines['cumulative_accuracy'].to_numpy(dtype=object), gaps, None),
+                mode='lines',
+                line=dict(color='gray', width=1, dash='dot'),
+                opacity=0.4,
+                showlegend=False,
+                hovertemplate='<b>User: %{text}</b><br>' +
+                             'Attempt %{x}<br>' +
+                             'Accuracy: %{y:.1%}<extra></extra>',
+                text=np.insert(labels, gaps, None)
+            ))
     
     # Update layout
     fig.update_layout(
@@ -223,7 +386,9 @@ def render_user_progression_analysis(data_loader):
         xaxis_title='Attempt Number',
         yaxis_title='Cumulative Accuracy Rate',
         height=500,
-        hovermode='x unified'
+        # A unified tooltip collects every trace at the hovered x, which gets
+        # slow with many points; fall back to the nearest point then
+        hovermode='x unified' if _plotted_points(fig) <= _UNIFIED_HOVER_MAX_POINTS else 'closest'
     )
     
     fig.update_yaxes(tickformat='.0%', range=[0, 1])
@@ -231,42 +396,26 @@ def render_user_progression_analysis(data_loader):
     st.plotly_chart(fig, use_container_width=True)
     
     # Visual interpretation guide
-    st.markdown("""
-    ### 👁️ **What You're Looking At in This Chart:**
-    - **📊 Chart Type:** Multi-line progression chart with distribution bands
-    - **📈 X-Axis:** Attempt number (1st question, 2nd question, etc.)
-    - **📊 Y-Axis:** Cumulative accuracy rate (lifetime average to that point)
-    - **🎯 Blue Shaded Area:** Range where 50% of users perform (25th-75th percentile)
-    - **📏 Dark Blue Line:** Average performance across all users
-    - **📍 Gray Dotted Lines:** Individual user learning curves (if enabled)
-    
-    **How to Read It:**
-    - **Upward trending blue line** = Users are learning over time
-    - **Wider blue band** = More variation between high/low performers
-    - **Narrower blue band** = Users becoming more consistent
-    - **Higher position** = Better overall performance
-    - **Steeper slopes** = Faster learning rate
-    """)
+    st.markdown(_CHART_GUIDE_MD)
     
     # Show key progression metrics
     col1, col2, col3, col4 = st.columns(4)
     
+    initial_accuracy = summary['initial_accuracy']
+    final_accuracy = summary['final_accuracy']
+    
     with col1:
-        initial_accuracy = distribution_stats['average'].iloc[0] if len(distribution_stats) > 0 else 0
         st.metric("Initial Accuracy", f"{initial_accuracy:.1%}")
     
     with col2:
-        final_accuracy = distribution_stats['average'].iloc[-1] if len(distribution_stats) > 0 else 0
         improvement = final_accuracy - initial_accuracy
         st.metric("Final Accuracy", f"{final_accuracy:.1%}", f"{improvement:+.1%}")
     
     with col3:
-        max_attempts = distribution_stats['attempt_number'].max() if len(distribution_stats) > 0 else 0
-        st.metric("Max Attempts Tracked", max_attempts)
+        st.metric("Max Attempts Tracked", summary['max_attempts'])
     
     with col4:
-        avg_users_per_attempt = distribution_stats['count'].mean() if len(distribution_stats) > 0 else 0
-        st.metric("Avg Users per Attempt", f"{avg_users_per_attempt:.0f}")
+        st.metric("Avg Users per Attempt", f"{summary['avg_users_per_attempt']:.0f}")
     
     # Show detailed progression insights
     st.subheader("📊 Progression Insights")
@@ -283,10 +432,8 @@ def render_user_progression_analysis(data_loader):
         else:
             st.error(f"📉 **Concerning Trend:** Performance declining by {abs(learning_trend):.1%} - investigate content difficulty or fatigue")
         
-        # Calculate consistency
-        final_band_width = distribution_stats['q75'].iloc[-1] - distribution_stats['q25'].iloc[-1]
-        initial_band_width = distribution_stats['q75'].iloc[0] - distribution_stats['q25'].iloc[0]
-        consistency_change = final_band_width - initial_band_width
+        # Change in the 25th-75th band width from first to last point
+        consistency_change = summary['consistency_change']
         
         if consistency_change < -0.05:
             st.success(f"🎯 **Increasing Consistency:** Performance gap narrowing by {abs(consistency_change):.1%}")
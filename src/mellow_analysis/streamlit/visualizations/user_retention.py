@@ -58,7 +58,10 @@ def render_retention_analysis(data_loader):
     responses_df = data_loader.load_responses()
     
     # Calculate each user's first and last activity
-    user_activity = responses_df.groupby('id_user_hash')['exam_created_at'].agg(['min', 'max']).reset_index()
+    user_activity = (
+        responses_df.groupby('id_user_hash', observed=True)['exam_created_at']
+        .agg(['min', 'max']).reset_index()
+    )
     user_activity.columns = ['user_id', 'first_activity', 'last_activity']
     
     # Calculate days since first attempt for last activity (user's "lifespan")
@@ -8,6 +8,67 @@ to categorize users into High Performers, Quick Learners, Average Learners, and
 import streamlit as st
 import plotly.express as px
 import pandas as pd
+import numpy as np
+
+
+@st.cache_data(show_spinner=False)
+def _user_stats(data_version: tuple, _data_loader) -> pd.DataFrame:
+    """
+    Per-user accuracy, attempts, activity span and segment, once per data version.
+    
+    The loader argument is underscore-prefixed so Streamlit does not hash it;
+    data_version (file paths + mtimes) is the cache key.
+    """
+    responses_df = _data_loader.load_responses()
+    
+    # Calculate user statistics
+    user_stats = responses_df.groupby('id_user_hash', observed=True).agg({
+        'is_correct': ['mean', 'count'],
+        'exam_created_at': ['min', 'max']
+    }).reset_index()
+    
+    # Flatten column names
+    user_stats.columns = ['user_id', 'accuracy', 'total_attempts', 'first_attempt', 'last_attempt']
+    
+    # Calculate engagement days
+    user_stats['engagement_days'] = (user_stats['last_attempt'] - user_stats['first_attempt']).dt.days + 1
+    
+    # Define user segments with clear boundaries (first matching condition wins)
+    accuracy = user_stats['accuracy'].to_numpy()
+    attempts = user_stats['total_attempts'].to_numpy()
+    user_stats['segment'] = np.select(
+        [
+            (accuracy >= 0.8) & (attempts >= 20),
+            (accuracy >= 0.8) & (attempts < 20),
+            accuracy < 0.5
+        ],
+        ['High Performers', 'Quick Learners', 'Struggling Users'],
+        default='Average Learners'
+    ).astype(object)
+    
+    return user_stats
+
+
+@st.cache_data(show_spinner=False)
+def _segment_summary(data_version: tuple, _data_loader) -> pd.DataFrame:
+    """Formatted per-segment breakdown table, once per data version."""
+    user_stats = _user_stats(data_version, _data_loader)
+    
+    segment_summary = user_stats.groupby('segment').agg({
+        'user_id': 'count',
+        'accuracy': 'mean',
+        'total_attempts': 'mean',
+        'engagement_days': 'mean'
+    }).round(2)
+    
+    segment_summary.columns = ['User Count', 'Avg Accuracy', 'Avg Attempts', 'Avg Engagement Days']
+    segment_summary['Percentage'] = (segment_summary['User Count'] / len(user_stats) * 100).round(1)
+    
+    # Format the display
+    segment_summary['Avg Accuracy'] = segment_summary['Avg Accuracy'].apply(lambda x: f"{x:.1%}")
+    segment_summary['Percentage'] = segment_summary['Percentage'].apply(lambda x: f"{x:.1f}%")
+    
+    return segment_summary
 
 
 def render_user_segments(data_loader):
@@ -23,21 +84,21 @@ def render_user_segments(data_loader):
         **Two-Dimensional Segmentation Approach:**
         ```python
         # Step 1: Calculate performance and engagement metrics per user
-        user_stats = responses_df.groupby('id_user_hash').agg({
+        user_stats = responses_df.groupby('id_user_hash', observed=True).agg({
             'is_correct': ['mean', 'count'],      # Performance & Engagement
             'exam_created_at': ['min', 'max']     # Activity timespan
         })
         
-        # Step 2: Apply segmentation logic
-        def segment_user(accuracy, attempts):
-            if accuracy >= 0.8 and attempts >= 20:
-                return 'High Performers'
-            elif accuracy >= 0.8 and attempts < 20:
-                return 'Quick Learners' 
-            elif accuracy < 0.5:
-                return 'Struggling Users'
-            else:
-                return 'Average Learners'
+        # Step 2: Apply segmentation logic (first matching condition wins)
+        user_stats['segment'] = np.select(
+            [
+                (accuracy >= 0.8) & (attempts >= 20),   # High Performers
+                (accuracy >= 0.8) & (attempts < 20),    # Quick Learners
+                accuracy < 0.5                          # Struggling Users
+            ],
+            ['High Performers', 'Quick Learners', 'Struggling Users'],
+            default='Average Learners'
+        )
         ```
         
         **Segmentation Matrix Explanation:**
@@ -65,36 +126,9 @@ def render_user_segments(data_loader):
         segment_df = pd.DataFrame(segment_data)
         st.table(segment_df)
     
-    # Load data
-    responses_df = data_loader.load_responses()
-    
-    # Calculate user statistics
-    user_stats = responses_df.groupby('id_user_hash').agg({
-        'is_correct': ['mean', 'count'],
-        'exam_created_at': ['min', 'max']
-    }).reset_index()
-    
-    # Flatten column names
-    user_stats.columns = ['user_id', 'accuracy', 'total_attempts', 'first_attempt', 'last_attempt']
-    
-    # Calculate engagement days
-    user_stats['engagement_days'] = (user_stats['last_attempt'] - user_stats['first_attempt']).dt.days + 1
-    
-    # Define user segments with clear boundaries
-    def segment_user(row):
-        accuracy = row['accuracy']
-        attempts = row['total_attempts']
-        
-        if accuracy >= 0.8 and attempts >= 20:
-            return 'High Performers'
-        elif accuracy >= 0.8 and attempts < 20:
-            return 'Quick Learners'
-        elif accuracy < 0.5:
-            return 'Struggling Users'
-        else:
-            return 'Average Learners'
-    
-    user_stats['segment'] = user_stats.apply(segment_user, axis=1)
+    # Per-user stats and segments (cached per data version across reruns)
+    data_version = data_loader.get_data_version()
+    user_stats = _user_stats(data_version, data_loader)
     
     # Create scatter plot with boundary lines - THE VISUALIZATION YOU REMEMBER!
     fig = px.scatter(
@@ -149,19 +183,7 @@ def render_user_segments(data_loader):
     # Show segment statistics
     st.subheader("📊 Segment Breakdown")
     
-    segment_summary = user_stats.groupby('segment').agg({
-        'user_id': 'count',
-        'accuracy': 'mean',
-        'total_attempts': 'mean',
-        'engagement_days': 'mean'
-    }).round(2)
-    
-    segment_summary.columns = ['User Count', 'Avg Accuracy', 'Avg Attempts', 'Avg Engagement Days']
-    segment_summary['Percentage'] = (segment_summary['User Count'] / len(user_stats) * 100).round(1)
-    
-    # Format the display
-    segment_summary['Avg Accuracy'] = segment_summary['Avg Accuracy'].apply(lambda x: f"{x:.1%}")
-    segment_summary['Percentage'] = segment_summary['Percentage'].apply(lambda x: f"{x:.1f}%")
+    segment_summary = _segment_summary(data_version, data_loader)
     
     st.dataframe(segment_summary, use_container_width=True)
     
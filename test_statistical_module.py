@@ -4,14 +4,234 @@ Quick test script to verify the statistical testing module works correctly.
 """
 
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-from mellow_analysis.data.loader import data_loader
-from mellow_analysis.streamlit.statistical_tests.utils import prepare_user_level_data, get_available_grouping_variables
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from mellow_analysis.data.loader import DataLoader, data_loader
+from mellow_analysis.streamlit.statistical_tests.data_preparation import (
+    _USER_FIRST_COLUMNS, _aggregate_by_user
+)
+from mellow_analysis.streamlit.statistical_tests.group_builder import GroupDefinition, _prepare_outcome
+from mellow_analysis.streamlit.statistical_tests.statistical_engine import (
+    StatisticalTestEngine, _mann_whitney_asymptotic
+)
+from mellow_analysis.streamlit.visualizations import overview_metrics, user_progression
+
+
+def _synthetic_responses(n_rows: int = 400, n_users: int = 25, seed: int = 0) -> pd.DataFrame:
+    """Unsorted response rows with missing users, all-null profile users and NaT exam times."""
+    rng = np.random.default_rng(seed)
+    users = np.array([f"user_{i:02d}" for i in range(n_users)], dtype=object)
+    df = pd.DataFrame({
+        'id_user_hash': rng.choice(users, n_rows),
+        'is_correct': rng.integers(0, 2, n_rows).astype(np.int8),
+        'exam_created_at': (pd.Timestamp('2024-01-01')
+                            + pd.to_timedelta(rng.integers(0, 90 * 24, n_rows), unit='h')),
+    })
+    for column in _USER_FIRST_COLUMNS:
+        values = rng.choice(np.array(['a', 'b', 'c', None], dtype=object), n_rows)
+        df[column] = values
+    
+    # user_00: every profile field null; user_01: every exam time NaT
+    df.loc[df['id_user_hash'] == 'user_00', list(_USER_FIRST_COLUMNS)] = None
+    df['exam_created_at'] = df['exam_created_at'].mask(df['id_user_hash'] == 'user_01')
+    # Scattered NaT times and rows without a user (groupby drops those)
+    df.loc[rng.random(n_rows) < 0.05, 'exam_created_at'] = pd.NaT
+    df.loc[rng.random(n_rows) < 0.03, 'id_user_hash'] = None
+    return df
+
+
+def test_aggregate_by_user_matches_groupby():
+    """_aggregate_by_user agrees with the groupby aggregation it replaced."""
+    responses_df = _synthetic_responses()
+    result = _aggregate_by_user(responses_df)
+    
+    expected = responses_df.groupby('id_user_hash').agg(
+        accuracy=('is_correct', 'mean'),
+        total_responses=('is_correct', 'count'),
+        correct_responses=('is_correct', 'sum'),
+        first_exam=('exam_created_at', 'min'),
+        last_exam=('exam_created_at', 'max'),
+        **{name: (column, 'first') for column, name in _USER_FIRST_COLUMNS.items()}
+    ).rename_axis('user_id').reset_index()
+    
+    assert list(result['user_id']) == list(expected['user_id'])
+    for column in ['accuracy', 'total_responses', 'correct_responses', 'first_exam', 'last_exam']:
+        pd.testing.assert_series_equal(result[column], expected[column], check_dtype=False)
+    for name in _USER_FIRST_COLUMNS.values():
+        # groupby fills all-null groups with NaN, _first_valid with None
+        assert list(result[name].where(result[name].notna(), None)) == \
+            list(expected[name].where(expected[name].notna(), None)), name
+    
+    all_null = result['user_id'] == 'user_00'
+    assert result.loc[all_null, list(_USER_FIRST_COLUMNS.values())].isna().all(axis=None)
+    assert result.loc[result['user_id'] == 'user_01', ['first_exam', 'last_exam']].isna().all(axis=None)
+
+
+def test_mann_whitney_asymptotic_matches_scipy():
+    """The single-sort Mann-Whitney U agrees with SciPy's asymptotic method on tied data."""
+    rng = np.random.default_rng(1)
+    for n_a, n_b in [(200, 200), (120, 80), (25, 300)]:
+        # Rounded draws give heavy ties, the case the tie correction covers
+        data_a = np.round(rng.normal(0.0, 1.0, n_a), 1)
+        data_b = np.round(rng.normal(0.2, 1.0, n_b), 1)
+        for a, b in [(data_a, data_b), (data_a.astype(np.float32), data_b.astype(np.float32))]:
+            u, p_value = _mann_whitney_asymptotic(a, b)
+            expected = stats.mannwhitneyu(a, b, alternative='two-sided', method='asymptotic')
+            assert u == expected.statistic, (n_a, n_b, u, expected.statistic)
+            assert abs(p_value - expected.pvalue) < 1e-6, (n_a, n_b, p_value, expected.pvalue)
+
+
+def test_running_accuracy_matches_groupby():
+    """Serial and chunked-parallel running accuracy agree with groupby cumcount/cumsum."""
+    rng = np.random.default_rng(2)
+    saved = (user_progression._PROGRESSION_WORKERS, user_progression._PARALLEL_MIN_ROWS,
+             user_progression._PROGRESSION_POOL)
+    pool = ThreadPoolExecutor(max_workers=4)
+    try:
+        for parallel in (False, True):
+            # Force the chunked path even on small inputs and single-CPU hosts
+            if parallel:
+                user_progression._PROGRESSION_WORKERS = 4
+                user_progression._PARALLEL_MIN_ROWS = 0
+                user_progression._PROGRESSION_POOL = pool
+            for _ in range(150):
+                # From one long group to many single-row groups
+                n_groups = int(rng.integers(1, 40))
+                lengths = rng.integers(1, int(rng.choice([2, 10, 200])), n_groups)
+                group_codes = np.repeat(np.arange(n_groups), lengths)
+                is_correct = rng.integers(0, 2, group_codes.size).astype(np.int8)
+                
+                attempt_number, accuracy = user_progression._running_accuracy(is_correct, group_codes)
+                
+                grouped = pd.Series(is_correct).groupby(group_codes)
+                expected_attempt = grouped.cumcount().to_numpy() + 1
+                expected_accuracy = grouped.cumsum().to_numpy() / expected_attempt
+                assert np.array_equal(attempt_number, expected_attempt), parallel
+                assert np.allclose(accuracy, expected_accuracy, rtol=0, atol=1e-12), parallel
+    finally:
+        (user_progression._PROGRESSION_WORKERS, user_progression._PARALLEL_MIN_ROWS,
+         user_progression._PROGRESSION_POOL) = saved
+        pool.shutdown()
+
+
+def test_daily_stats_matches_groupby():
+    """Per-day counts and bitset unique users agree with the groupby they replaced."""
+    daily = overview_metrics._daily_stats(data_loader.get_data_version(), data_loader)
+    responses_df = data_loader.load_responses()
+    expected = responses_df.groupby('date', observed=True).agg(
+        accuracy=('is_correct', 'mean'),
+        total_responses=('is_correct', 'count'),
+        unique_users=('id_user_hash', 'nunique'),
+    )
+    assert list(daily['date']) == list(expected.index)
+    for column in expected.columns:
+        pd.testing.assert_series_equal(
+            daily[column], expected[column].reset_index(drop=True), check_dtype=False
+        )
+
+
+def test_unique_users_per_date_fallback():
+    """The bitset and the oversized-bitset nunique fallback count the same users."""
+    rng = np.random.default_rng(3)
+    n_dates = 30
+    date_codes = rng.integers(0, n_dates - 5, 2000)  # last dates have no rows
+    user_codes = rng.integers(-1, 300, 2000).astype(np.int32)  # -1 is a missing user
+    expected = np.zeros(n_dates, dtype=np.int64)
+    counts = pd.Series(user_codes[user_codes >= 0]).groupby(date_codes[user_codes >= 0]).nunique()
+    expected[counts.index] = counts
+    
+    saved = overview_metrics._USER_BITSET_MAX_BYTES
+    try:
+        for max_bytes in (saved, 0):
+            overview_metrics._USER_BITSET_MAX_BYTES = max_bytes
+            unique_users = overview_metrics._unique_users_per_date(date_codes, user_codes, n_dates)
+            assert np.array_equal(unique_users, expected), max_bytes
+    finally:
+        overview_metrics._USER_BITSET_MAX_BYTES = saved
+
+
+def test_compare_groups_selects_test_from_assumptions():
+    """Normality and variance checks (looked up by group name) pick the test that runs."""
+    rng = np.random.default_rng(4)
+    samples = {
+        'normal_a': rng.normal(0.0, 1.0, 200),
+        'normal_b': rng.normal(0.3, 1.0, 200),
+        'wide_b': rng.normal(0.3, 3.0, 200),
+        'skewed_b': rng.exponential(1.0, 200),
+    }
+    df = pd.DataFrame({
+        'group': np.repeat(list(samples), 200),
+        'score': np.concatenate(list(samples.values())),
+    })
+    engine = StatisticalTestEngine()
+    group_a = GroupDefinition(name="Group A", categorical_filters={'group': ['normal_a']})
+    
+    for group, expected_test in [('normal_b', "Student's t-test"),
+                                 ('wide_b', "Welch's t-test"),
+                                 ('skewed_b', "Mann-Whitney U test")]:
+        group_b = GroupDefinition(name="Group B", categorical_filters={'group': [group]})
+        result = engine.compare_groups(group_a, group_b, df, 'score')
+        assert result.test_name == expected_test, (group, result.test_name)
+        if expected_test != "Mann-Whitney U test":
+            expected = stats.ttest_ind(samples['normal_a'], samples[group],
+                                       equal_var=expected_test == "Student's t-test")
+            assert abs(result.p_value - expected.pvalue) < 1e-4, (group, result.p_value)
+
+
+def test_prepare_outcome_unfingerprinted_frames():
+    """Throwaway frames (whose ids CPython reuses) never get another frame's outcome array."""
+    for i in range(200):
+        arr, notna = _prepare_outcome(pd.DataFrame({'y': np.full(10, i)}), 'y')
+        assert arr[0] == i and notna.all(), i
+
+
+def test_group_masks_unfingerprinted_frames():
+    """One GroupDefinition never reuses a mask or size across throwaway same-shape frames."""
+    group = GroupDefinition(name="Group A", categorical_filters={'g': ['x']})
+    for i in range(100):
+        df = pd.DataFrame({'g': ['x'] * (i % 5) + ['y'] * (10 - i % 5)})
+        assert np.count_nonzero(group.compute_mask(df)) == i % 5, i
+        assert group.validate(df, min_size=1)['size'] == i % 5, i
+
+
+def test_missing_exam_times_load():
+    """Responses without an exam time load with a missing hour and drop out of the hourly counts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ['rc_invokana_cases.csv', 'rc_invokana_users_responses_nopersonal_hash.csv']:
+            df = pd.read_csv(data_loader.data_dir / name, nrows=200)
+            if 'exam_created_at' in df.columns:
+                df.loc[[0, 50, 150], 'exam_created_at'] = None
+            df.to_csv(Path(tmp) / name, index=False)
+        
+        # The loader methods' st.cache_data entries ignore the instance, so
+        # clear them around the temporary loader
+        cached_loads = [DataLoader.load_cases, DataLoader.load_responses,
+                        DataLoader.load_hot_responses, DataLoader.load_full_dataset]
+        for load in cached_loads:
+            load.clear()
+        try:
+            loader = DataLoader(tmp)
+            responses_df = loader.load_responses()
+            assert responses_df['hour'].isna().sum() == 3
+            
+            hourly = overview_metrics._hourly_activity(loader.get_data_version(), loader)
+            assert hourly['responses'].sum() == len(responses_df) - 3
+            daily = overview_metrics._daily_stats(loader.get_data_version(), loader)
+            assert daily['total_responses'].sum() == len(responses_df) - 3
+        finally:
+            for load in cached_loads:
+                load.clear()
+
 
 def test_statistical_module():
     """Test the statistical module functionality."""
@@ -20,6 +240,10 @@ def test_statistical_module():
     print("=" * 50)
     
     try:
+        from mellow_analysis.streamlit.statistical_tests.utils import (
+            prepare_user_level_data, get_available_grouping_variables
+        )
+        
         # Test data loading
         print("\n1. Testing data preparation...")
         user_df = prepare_user_level_data(data_loader)
@@ -56,4 +280,20 @@ def test_statistical_module():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    test_statistical_module() 
\ No newline at end of file
+    test_aggregate_by_user_matches_groupby()
+    print("✅ _aggregate_by_user matches groupby")
+    test_mann_whitney_asymptotic_matches_scipy()
+    print("✅ _mann_whitney_asymptotic matches scipy")
+    test_running_accuracy_matches_groupby()
+    print("✅ _running_accuracy matches groupby (serial and parallel)")
+    test_daily_stats_matches_groupby()
+    test_unique_users_per_date_fallback()
+    print("✅ daily unique users match groupby nunique (bitset and fallback)")
+    test_compare_groups_selects_test_from_assumptions()
+    test_prepare_outcome_unfingerprinted_frames()
+    test_group_masks_unfingerprinted_frames()
+    test_missing_exam_times_load()
+    print("✅ compare_groups selects t-test, Welch or Mann-Whitney from the assumptions")
+    print("✅ outcome arrays and group masks are not reused across unfingerprinted frames")
+    print("✅ responses with missing exam times load and are skipped by the hourly counts")
+    test_statistical_module()